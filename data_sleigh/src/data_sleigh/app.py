@@ -1,12 +1,19 @@
 """Main application logic for Data Sleigh."""
 
+import functools
 import logging
+import queue
 import signal
+import socket
 import sys
 import threading
 import time
+import types
+from collections import OrderedDict
+from collections.abc import Callable
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 import paho.mqtt.client as mqtt
 
@@ -21,11 +28,20 @@ from .backup import BackupManager
 from .config import load_config
 from .mqtt_client import MQTTLogger
 from .storage import MessageStore
+from .topics import TopicTrie
 from .uploader import create_json_output, read_from_s3, upload_to_s3
 from .yolink_client import YoLinkClient
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on cached topic -> table lookups
+TOPIC_CACHE_SIZE = 8192
+
+# Seconds to wait for each background thread to stop during cleanup
+THREAD_JOIN_TIMEOUT = 30
+
+_HOSTNAME = socket.gethostname()
+
 
 class DataSleighApp:
     """Main application for Data Sleigh.
@@ -38,7 +54,7 @@ class DataSleighApp:
         >>> app.run()
     """
 
-    def __init__(self, config_path: str | Path):
+    def __init__(self, config_path: str | Path) -> None:
         """Initialize the application.
 
         Args:
@@ -57,14 +73,61 @@ class DataSleighApp:
         self._running = False
         self._shutdown_event = threading.Event()
 
-        # Map topics to table names
-        self._topic_table_map: dict[str, str] = {}
+        # Incoming MQTT messages, handed from the network thread to the writer
+        # thread as (table_name, received_at, topic, payload, qos, retain);
+        # None stops the writer
+        self._message_queue: queue.Queue[
+            tuple[str, datetime, str, bytes, int, bool] | None
+        ] = queue.Queue(maxsize=self.config.database.batch_size * 4)
+        self._writer_thread: threading.Thread | None = None
+        self._flush_thread: threading.Thread | None = None
+
+        # Bound store.insert_batch, rebound whenever storage is (re)created
+        self._insert_batch: (
+            Callable[[str, list[tuple[datetime, str, bytes, int, bool]]], None] | None
+        ) = None
+
+        # Map topics to table names (LRU, bounded by TOPIC_CACHE_SIZE)
+        self._topic_table_map: OrderedDict[str, str] = OrderedDict()
 
         # Cache for analysis results
-        self._cached_analysis = None
+        self._cached_analysis: dict[str, Any] | None = None
 
         logger.info("Data Sleigh application initialized")
 
+    @functools.cached_property
+    def _topic_trie(self) -> TopicTrie:
+        """Trie of the configured topic patterns, built on first use."""
+        trie = TopicTrie()
+        for topic_config in self.config.topics:
+            trie.add(topic_config.pattern_parts, sys.intern(topic_config.table_name))
+        return trie
+
+    @functools.cached_property
+    def _exact_topics(self) -> dict[str, str]:
+        """Literal patterns, resolved with one dict lookup.
+
+        Resolved through the trie, so an earlier overlapping wildcard pattern
+        still takes priority.
+        """
+        return {
+            sys.intern(topic_config.pattern): self._topic_trie.match(
+                topic_config.pattern
+            )
+            for topic_config in self.config.topics
+            if "+" not in topic_config.pattern_parts
+            and "#" not in topic_config.pattern_parts
+        }
+
+    @functools.cached_property
+    def _topics_list(self) -> str:
+        """Configured topics, formatted once for notifications."""
+        return "\n".join([
+            f"  • {t.pattern} → {t.table_name}"
+            + (f" ({t.description})" if t.description else "")
+            for t in self.config.topics
+        ])
+
     def _setup_logging(self) -> None:
         """Configure logging based on config."""
         log_config = self.config.logging
@@ -88,7 +151,7 @@ class DataSleighApp:
         signal.signal(signal.SIGTERM, self._signal_handler)
         logger.info("Signal handlers registered")
 
-    def _signal_handler(self, signum: int, frame: any) -> None:
+    def _signal_handler(self, signum: int, frame: types.FrameType | None) -> None:
         """Handle shutdown signals.
 
         Args:
@@ -123,70 +186,107 @@ class DataSleighApp:
             qos: Quality of Service level
             retain: Whether message was retained
         """
+        # paho hands over a fresh string per message; interning makes the
+        # cache lookups below (and the batched rows) share one object per topic
+        topic = sys.intern(topic)
+
         # Find matching table for this topic
         table_name = self._find_table_for_topic(topic)
 
-        if table_name and self.store:
+        if table_name:
+            # Storage happens on the writer thread so a slow insert never
+            # stalls the MQTT network loop
+            item = (table_name, datetime.now(), topic, payload, qos, retain)
             try:
-                self.store.insert_message(table_name, topic, payload, qos, retain)
-            except Exception as e:
-                logger.error(f"Failed to store message from {topic}: {e}")
+                self._message_queue.put_nowait(item)
+            except queue.Full:
+                # Keep the freshest readings: drop the oldest queued message
+                try:
+                    oldest = self._message_queue.get_nowait()
+                except queue.Empty:
+                    pass  # The writer caught up in the meantime
+                else:
+                    if oldest is None:
+                        # Shutting down; keep the writer's stop sentinel instead
+                        item = None
+                    else:
+                        logger.warning(
+                            f"Message queue full, dropped message from {oldest[2]}"
+                        )
+                try:
+                    self._message_queue.put_nowait(item)
+                except queue.Full:
+                    pass
         else:
             logger.warning(f"No table mapping found for topic: {topic}")
 
-    def _find_table_for_topic(self, topic: str) -> str | None:
-        """Find the appropriate table for a given topic.
+    def _writer_loop(self) -> None:
+        """Background thread that stores queued MQTT messages."""
+        batch_size = self.config.database.batch_size
 
-        Args:
-            topic: MQTT topic
-
-        Returns:
-            Table name or None if no match found
-        """
-        # Check cache first
-        if topic in self._topic_table_map:
-            return self._topic_table_map[topic]
+        while True:
+            item = self._message_queue.get()
+            if item is None:
+                return
 
-        # Find matching pattern
-        for topic_config in self.config.topics:
-            if self._topic_matches_pattern(topic, topic_config.pattern):
-                table_name = topic_config.table_name
-                self._topic_table_map[topic] = table_name
-                return table_name
+            # Drain whatever else is already waiting, up to one batch
+            batch = [item]
+            stop = False
+            while len(batch) < batch_size:
+                try:
+                    item = self._message_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            insert_batch = self._insert_batch
+            if insert_batch is not None:
+                # One store call per table for the whole drained batch
+                by_table: dict[str, list[tuple[datetime, str, bytes, int, bool]]] = {}
+                for item in batch:
+                    by_table.setdefault(item[0], []).append(item[1:])
+                for table_name, messages in by_table.items():
+                    try:
+                        insert_batch(table_name, messages)
+                    except Exception as e:
+                        logger.error(
+                            f"Failed to store {len(messages)} messages "
+                            f"for {table_name}: {e}"
+                        )
 
-        return None
+            if stop:
+                return
 
-    @staticmethod
-    def _topic_matches_pattern(topic: str, pattern: str) -> bool:
-        """Check if a topic matches an MQTT pattern.
+    def _find_table_for_topic(self, topic: str) -> str | None:
+        """Find the appropriate table for a given topic.
 
         Args:
-            topic: Actual MQTT topic
-            pattern: Pattern with wildcards (+ for single level, # for multi-level)
+            topic: MQTT topic
 
         Returns:
-            True if topic matches pattern
+            Table name or None if no match found
         """
-        topic_parts = topic.split("/")
-        pattern_parts = pattern.split("/")
-
-        # Handle # wildcard (must be last)
-        if "#" in pattern_parts:
-            if pattern_parts[-1] != "#":
-                return False
-            pattern_parts = pattern_parts[:-1]
-            topic_parts = topic_parts[: len(pattern_parts)]
+        # Literal patterns first, then the cache
+        table_name = self._exact_topics.get(topic)
+        if table_name is not None:
+            return table_name
 
-        # Check length match
-        if len(topic_parts) != len(pattern_parts):
-            return False
+        table_name = self._topic_table_map.get(topic)
+        if table_name is not None:
+            self._topic_table_map.move_to_end(topic)
+            return table_name
 
-        # Check each level
-        for topic_part, pattern_part in zip(topic_parts, pattern_parts, strict=True):
-            if pattern_part != "+" and pattern_part != topic_part:
-                return False
+        # Find matching pattern
+        table_name = self._topic_trie.match(topic)
+        if table_name is not None:
+            self._topic_table_map[topic] = table_name
+            if len(self._topic_table_map) > TOPIC_CACHE_SIZE:
+                self._topic_table_map.popitem(last=False)
 
-        return True
+        return table_name
 
     def _handle_yolink_sensor(
         self,
@@ -239,6 +339,7 @@ class DataSleighApp:
             self.config.database.batch_size,
             self.config.database.flush_interval,
         )
+        self._insert_batch = self.store.insert_batch
 
         # Create tables for all configured topics
         for topic_config in self.config.topics:
@@ -615,23 +716,13 @@ class DataSleighApp:
         if not self.config.alerting.email_to:
             return
 
-        import socket
-
-        hostname = socket.gethostname()
         start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S %Z")
         in_season = self.is_in_season()
 
-        # Format topics list
-        topics_list = "\n".join([
-            f"  • {t.pattern} → {t.table_name}"
-            + (f" ({t.description})" if t.description else "")
-            for t in self.config.topics
-        ])
-
         subject = "Data Sleigh Started Successfully"
         body = f"""Data Sleigh has started successfully!
 
-Container: {hostname}
+Container: {_HOSTNAME}
 Start Time: {start_time}
 
 Season Configuration:
@@ -655,7 +746,7 @@ Database Configuration:
   Flush Interval: {self.config.database.flush_interval} seconds
 
 Topics:
-{topics_list}
+{self._topics_list}
 
 Logging:
   Level: {self.config.logging.level}
@@ -700,15 +791,18 @@ This is an automated notification.
 
     def _flush_loop(self) -> None:
         """Background thread to periodically flush database."""
-        while self._running:
-            time.sleep(self.config.database.flush_interval)
-            if self.store and self._running:
+        flush_interval = self.config.database.flush_interval
+        db_path = self.config.database.path
+
+        # wait() returns True as soon as shutdown is signalled
+        while not self._shutdown_event.wait(flush_interval):
+            if self.store:
                 try:
                     self.store.flush()
 
                     # Run alert checks after flush
                     if self.alert_manager:
-                        self.alert_manager.check_all(self.config.database.path)
+                        self.alert_manager.check_all(db_path)
                 except Exception as e:
                     logger.error(f"Error during periodic flush: {e}")
 
@@ -872,12 +966,19 @@ This is an automated notification.
             self._send_startup_notification()
 
             # Start background threads
-            flush_thread = threading.Thread(
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop,
+                daemon=True,
+                name="WriterThread",
+            )
+            self._writer_thread.start()
+
+            self._flush_thread = threading.Thread(
                 target=self._flush_loop,
                 daemon=True,
                 name="FlushThread",
             )
-            flush_thread.start()
+            self._flush_thread.start()
 
             upload_thread = threading.Thread(
                 target=self._upload_loop,
@@ -964,6 +1065,25 @@ This is an automated notification.
         """Cleanup resources."""
         logger.info("Cleaning up resources...")
 
+        # Wake the background loops even if run() exited without shutdown()
+        self._shutdown_event.set()
+
+        # Let an in-progress periodic flush finish before the database closes
+        if self._flush_thread and self._flush_thread.is_alive():
+            self._flush_thread.join(timeout=THREAD_JOIN_TIMEOUT)
+            if self._flush_thread.is_alive():
+                logger.warning("Flush thread did not stop in time")
+
+        # Store everything still queued before the database closes
+        if self._writer_thread and self._writer_thread.is_alive():
+            try:
+                self._message_queue.put(None, timeout=THREAD_JOIN_TIMEOUT)
+            except queue.Full:
+                logger.warning("Message queue still full, writer not stopped")
+            self._writer_thread.join(timeout=THREAD_JOIN_TIMEOUT)
+            if self._writer_thread.is_alive():
+                logger.warning("Writer thread did not stop in time")
+
         # Close database
         if self.store:
             try:
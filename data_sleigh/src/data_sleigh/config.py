@@ -2,12 +2,14 @@
 
 import os
 import tomllib
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
+from typing import Any
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MQTTConfig:
     """MQTT broker configuration.
 
@@ -30,7 +32,7 @@ class MQTTConfig:
     qos: int = 1
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TopicConfig:
     """MQTT topic configuration.
 
@@ -38,14 +40,20 @@ class TopicConfig:
         pattern: MQTT topic pattern (can include wildcards)
         table_name: DuckDB table name for storing messages
         description: Optional description of the topic
+        pattern_parts: Pattern split into topic levels (computed)
     """
 
     pattern: str
     table_name: str
     description: str | None = None
+    pattern_parts: tuple[str, ...] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        # The pattern never changes after load, so split it once here
+        object.__setattr__(self, "pattern_parts", tuple(self.pattern.split("/")))
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class DatabaseConfig:
     """Database configuration.
 
@@ -60,7 +68,7 @@ class DatabaseConfig:
     flush_interval: int = 60
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoggingConfig:
     """Logging configuration.
 
@@ -75,7 +83,7 @@ class LoggingConfig:
     file: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AlertingConfig:
     """Alerting configuration for disk space monitoring.
 
@@ -92,7 +100,7 @@ class AlertingConfig:
     alert_cooldown_hours: int = 24
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class YoLinkConfig:
     """YoLink integration configuration.
 
@@ -117,7 +125,7 @@ class YoLinkConfig:
     max_reconnect_delay: int = 300
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MQTTEchoConfig:
     """Configuration for echoing YoLink MQTT messages to a local broker.
 
@@ -142,7 +150,7 @@ class MQTTEchoConfig:
     qos: int = 1
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SeasonConfig:
     """Season configuration for upload behavior.
 
@@ -158,7 +166,7 @@ class SeasonConfig:
     end: date
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class S3Config:
     """S3 configuration for uploads and backups.
 
@@ -177,7 +185,7 @@ class S3Config:
     aws_secret_access_key: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UploadConfig:
     """Upload behavior configuration.
 
@@ -192,7 +200,7 @@ class UploadConfig:
     replay_delay_seconds: int = 300
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BackupConfig:
     """Monthly backup configuration.
 
@@ -205,14 +213,14 @@ class BackupConfig:
     hour: int = 3
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Config:
     """Main application configuration.
 
     Attributes:
         mqtt: MQTT broker configuration
         database: Database configuration
-        topics: List of topic configurations
+        topics: Topic configurations, in matching priority order
         logging: Logging configuration
         alerting: Alerting configuration
         yolink: YoLink integration configuration
@@ -225,7 +233,7 @@ class Config:
 
     mqtt: MQTTConfig
     database: DatabaseConfig
-    topics: list[TopicConfig]
+    topics: tuple[TopicConfig, ...]
     logging: LoggingConfig
     alerting: AlertingConfig
     yolink: YoLinkConfig
@@ -236,9 +244,153 @@ class Config:
     backup: BackupConfig
 
 
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment variable value."""
+    return value.lower() in ("true", "1", "yes")
+
+
+# Environment variables that override values from the TOML file, by section:
+# section -> (environment variable, key, type)
+_ENV_OVERRIDES: dict[str, tuple[tuple[str, str, Callable[[str], Any]], ...]] = {
+    "mqtt": (
+        ("MQTT_BROKER", "broker", str),
+        ("MQTT_PORT", "port", int),
+        ("MQTT_USERNAME", "username", str),
+        ("MQTT_PASSWORD", "password", str),
+        ("MQTT_CLIENT_ID", "client_id", str),
+        ("MQTT_KEEPALIVE", "keepalive", int),
+        ("MQTT_QOS", "qos", int),
+    ),
+    "database": (
+        ("DB_PATH", "path", str),
+        ("DB_BATCH_SIZE", "batch_size", int),
+        ("DB_FLUSH_INTERVAL", "flush_interval", int),
+    ),
+    "logging": (
+        ("LOG_LEVEL", "level", str),
+        ("LOG_FILE", "file", str),
+    ),
+    "alerting": (
+        ("ALERT_EMAIL_TO", "email_to", str),
+        ("ALERT_DB_SIZE_MB", "db_size_threshold_mb", int),
+        ("ALERT_FREE_SPACE_MB", "free_space_threshold_mb", int),
+        ("ALERT_COOLDOWN_HOURS", "alert_cooldown_hours", int),
+    ),
+    "yolink": (
+        ("YOLINK_UAID", "uaid", str),
+        ("YOLINK_SECRET_KEY", "secret_key", str),
+        ("YOLINK_AIR_SENSOR_DEVICEID", "air_sensor_device_id", str),
+        ("YOLINK_WATER_SENSOR_DEVICEID", "water_sensor_device_id", str),
+        ("YOLINK_TABLE_NAME", "table_name", str),
+        ("YOLINK_RECONNECT_DELAY", "reconnect_delay", int),
+        ("YOLINK_MAX_RECONNECT_DELAY", "max_reconnect_delay", int),
+    ),
+    "mqtt_echo": (
+        ("MQTT_ECHO_ENABLED", "enabled", _parse_bool),
+        ("MQTT_ECHO_BROKER", "broker", str),
+        ("MQTT_ECHO_PORT", "port", int),
+        ("MQTT_ECHO_USERNAME", "username", str),
+        ("MQTT_ECHO_PASSWORD", "password", str),
+        ("MQTT_ECHO_CLIENT_ID", "client_id", str),
+        ("MQTT_ECHO_TOPIC_PREFIX", "topic_prefix", str),
+        ("MQTT_ECHO_QOS", "qos", int),
+    ),
+    "season": (
+        ("SEASON_START", "start", str),
+        ("SEASON_END", "end", str),
+    ),
+    "s3": (
+        ("S3_BUCKET", "bucket", str),
+        ("S3_JSON_KEY", "json_key", str),
+        ("S3_BACKUP_PREFIX", "backup_prefix", str),
+        ("AWS_ACCESS_KEY_ID", "aws_access_key_id", str),
+        ("AWS_SECRET_ACCESS_KEY", "aws_secret_access_key", str),
+    ),
+    "upload": (
+        ("UPLOAD_INTERVAL_SECONDS", "interval_seconds", int),
+        ("MINUTES_OF_DATA", "minutes_of_data", int),
+        ("REPLAY_DELAY_SECONDS", "replay_delay_seconds", int),
+    ),
+    "backup": (
+        ("BACKUP_DAY_OF_MONTH", "day_of_month", int),
+        ("BACKUP_HOUR", "hour", int),
+    ),
+}
+
+_ENV_KEYS = tuple(
+    env_key for overrides in _ENV_OVERRIDES.values() for env_key, _, _ in overrides
+)
+
+
+def _apply_env_overrides(section: str, section_data: dict[str, Any]) -> None:
+    """Apply the environment overrides for one config section in place.
+
+    Args:
+        section: Config section name, as used in _ENV_OVERRIDES
+        section_data: Parsed TOML data for the section
+    """
+    for env_key, key, cast in _ENV_OVERRIDES[section]:
+        value = os.environ.get(env_key)
+        if value:
+            section_data[key] = cast(value)
+
+
+# Sections that must be present, with the keys each must define
+_REQUIRED_KEYS: dict[str, tuple[str, ...]] = {
+    "mqtt": ("broker",),
+    "database": ("path",),
+    "season": ("start", "end"),
+    "s3": ("bucket",),
+}
+_REQUIRED_TOPIC_KEYS = ("pattern", "table_name")
+
+
+def _validate_config_data(data: dict[str, Any]) -> None:
+    """Check required sections and keys in one pass.
+
+    Args:
+        data: Parsed TOML data
+
+    Raises:
+        ValueError: Listing every missing section and key
+    """
+    problems = []
+
+    missing = [section for section in _REQUIRED_KEYS if section not in data]
+    if missing:
+        problems.append(f"Missing required section: {', '.join(missing)}")
+
+    if not data.get("topics"):
+        problems.append("At least one topic must be configured")
+    else:
+        problems += [
+            f"topic.{key} is required"
+            for key in _REQUIRED_TOPIC_KEYS
+            if any(key not in topic for topic in data["topics"])
+        ]
+
+    problems += [
+        f"{section}.{key} is required"
+        for section, keys in _REQUIRED_KEYS.items()
+        if section in data
+        for key in keys
+        if key not in data[section]
+    ]
+
+    if problems:
+        raise ValueError("; ".join(problems))
+
+
+# Last parsed config per file: path -> ((mtime_ns, size, env), config)
+_config_cache: dict[str, tuple[tuple, Config]] = {}
+
+
 def load_config(config_path: Path | str) -> Config:
     """Load configuration from a TOML file.
 
+    The parsed configuration is cached until the file or any of the
+    overriding environment variables change.
+
     Args:
         config_path: Path to the configuration file
 
@@ -256,79 +408,69 @@ def load_config(config_path: Path | str) -> Config:
     """
     config_path = Path(config_path)
 
-    if not config_path.exists():
-        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    try:
+        stat = config_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Configuration file not found: {config_path}"
+        ) from None
+
+    cache_key = str(config_path.resolve())
+    stamp = (
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(os.environ.get(key) for key in _ENV_KEYS),
+    )
+    cached = _config_cache.get(cache_key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    config = _parse_config(config_path)
+    _config_cache[cache_key] = (stamp, config)
+    return config
 
+
+def _parse_config(config_path: Path) -> Config:
+    """Parse and validate a configuration file, applying env overrides.
+
+    Args:
+        config_path: Path to an existing configuration file
+
+    Returns:
+        Parsed configuration object
+
+    Raises:
+        ValueError: If configuration is invalid
+    """
     with open(config_path, "rb") as f:
         data = tomllib.load(f)
 
-    # Validate required sections
-    if "mqtt" not in data:
-        raise ValueError("Missing required section: mqtt")
-    if "database" not in data:
-        raise ValueError("Missing required section: database")
-    if "topics" not in data or not data["topics"]:
-        raise ValueError("At least one topic must be configured")
-    if "season" not in data:
-        raise ValueError("Missing required section: season")
-    if "s3" not in data:
-        raise ValueError("Missing required section: s3")
+    _validate_config_data(data)
 
     # Parse MQTT config
     mqtt_data = data["mqtt"]
-    if "broker" not in mqtt_data:
-        raise ValueError("mqtt.broker is required")
 
     # Override with environment variables if set
-    if os.getenv("MQTT_BROKER"):
-        mqtt_data["broker"] = os.getenv("MQTT_BROKER")
-    if os.getenv("MQTT_PORT"):
-        mqtt_data["port"] = int(os.getenv("MQTT_PORT"))
-    if os.getenv("MQTT_USERNAME"):
-        mqtt_data["username"] = os.getenv("MQTT_USERNAME")
-    if os.getenv("MQTT_PASSWORD"):
-        mqtt_data["password"] = os.getenv("MQTT_PASSWORD")
-    if os.getenv("MQTT_CLIENT_ID"):
-        mqtt_data["client_id"] = os.getenv("MQTT_CLIENT_ID")
-    if os.getenv("MQTT_KEEPALIVE"):
-        mqtt_data["keepalive"] = int(os.getenv("MQTT_KEEPALIVE"))
-    if os.getenv("MQTT_QOS"):
-        mqtt_data["qos"] = int(os.getenv("MQTT_QOS"))
+    _apply_env_overrides("mqtt", mqtt_data)
 
     mqtt_config = MQTTConfig(**mqtt_data)
 
     # Parse database config
     db_data = data["database"]
-    if "path" not in db_data:
-        raise ValueError("database.path is required")
 
     # Override with environment variables if set
-    if os.getenv("DB_PATH"):
-        db_data["path"] = os.getenv("DB_PATH")
-    if os.getenv("DB_BATCH_SIZE"):
-        db_data["batch_size"] = int(os.getenv("DB_BATCH_SIZE"))
-    if os.getenv("DB_FLUSH_INTERVAL"):
-        db_data["flush_interval"] = int(os.getenv("DB_FLUSH_INTERVAL"))
+    _apply_env_overrides("database", db_data)
 
     database_config = DatabaseConfig(**db_data)
 
     # Parse topics
-    topics = []
-    for topic_data in data["topics"]:
-        if "pattern" not in topic_data:
-            raise ValueError("topic.pattern is required")
-        if "table_name" not in topic_data:
-            raise ValueError("topic.table_name is required")
-        topics.append(TopicConfig(**topic_data))
+    topics = [TopicConfig(**topic_data) for topic_data in data["topics"]]
 
     # Parse logging config (optional)
     logging_data = data.get("logging", {})
 
     # Override with environment variables if set
-    if os.getenv("LOG_LEVEL"):
-        logging_data["level"] = os.getenv("LOG_LEVEL")
-    if os.getenv("LOG_FILE"):
-        logging_data["file"] = os.getenv("LOG_FILE")
+    _apply_env_overrides("logging", logging_data)
 
     logging_config = LoggingConfig(**logging_data)
 
@@ -336,14 +478,7 @@ def load_config(config_path: Path | str) -> Config:
     alerting_data = data.get("alerting", {})
 
     # Override with environment variables if set
-    if os.getenv("ALERT_EMAIL_TO"):
-        alerting_data["email_to"] = os.getenv("ALERT_EMAIL_TO")
-    if os.getenv("ALERT_DB_SIZE_MB"):
-        alerting_data["db_size_threshold_mb"] = int(os.getenv("ALERT_DB_SIZE_MB"))
-    if os.getenv("ALERT_FREE_SPACE_MB"):
-        alerting_data["free_space_threshold_mb"] = int(os.getenv("ALERT_FREE_SPACE_MB"))
-    if os.getenv("ALERT_COOLDOWN_HOURS"):
-        alerting_data["alert_cooldown_hours"] = int(os.getenv("ALERT_COOLDOWN_HOURS"))
+    _apply_env_overrides("alerting", alerting_data)
 
     alerting_config = AlertingConfig(**alerting_data)
 
@@ -351,21 +486,9 @@ def load_config(config_path: Path | str) -> Config:
     yolink_data = data.get("yolink", {})
 
     # Override with environment variables if set
-    if os.getenv("YOLINK_UAID"):
-        yolink_data["uaid"] = os.getenv("YOLINK_UAID")
+    _apply_env_overrides("yolink", yolink_data)
+    if os.environ.get("YOLINK_UAID"):
         yolink_data["enabled"] = True
-    if os.getenv("YOLINK_SECRET_KEY"):
-        yolink_data["secret_key"] = os.getenv("YOLINK_SECRET_KEY")
-    if os.getenv("YOLINK_AIR_SENSOR_DEVICEID"):
-        yolink_data["air_sensor_device_id"] = os.getenv("YOLINK_AIR_SENSOR_DEVICEID")
-    if os.getenv("YOLINK_WATER_SENSOR_DEVICEID"):
-        yolink_data["water_sensor_device_id"] = os.getenv("YOLINK_WATER_SENSOR_DEVICEID")
-    if os.getenv("YOLINK_TABLE_NAME"):
-        yolink_data["table_name"] = os.getenv("YOLINK_TABLE_NAME")
-    if os.getenv("YOLINK_RECONNECT_DELAY"):
-        yolink_data["reconnect_delay"] = int(os.getenv("YOLINK_RECONNECT_DELAY"))
-    if os.getenv("YOLINK_MAX_RECONNECT_DELAY"):
-        yolink_data["max_reconnect_delay"] = int(os.getenv("YOLINK_MAX_RECONNECT_DELAY"))
 
     # Auto-enable if credentials are provided
     if yolink_data.get("uaid") and yolink_data.get("secret_key"):
@@ -377,39 +500,18 @@ def load_config(config_path: Path | str) -> Config:
     mqtt_echo_data = data.get("mqtt_echo", {})
 
     # Override with environment variables if set
-    if os.getenv("MQTT_ECHO_ENABLED"):
-        mqtt_echo_data["enabled"] = os.getenv("MQTT_ECHO_ENABLED").lower() in ("true", "1", "yes")
-    if os.getenv("MQTT_ECHO_BROKER"):
-        mqtt_echo_data["broker"] = os.getenv("MQTT_ECHO_BROKER")
-        # Auto-enable if broker is specified
+    _apply_env_overrides("mqtt_echo", mqtt_echo_data)
+    # Auto-enable if broker is specified
+    if os.environ.get("MQTT_ECHO_BROKER"):
         mqtt_echo_data["enabled"] = True
-    if os.getenv("MQTT_ECHO_PORT"):
-        mqtt_echo_data["port"] = int(os.getenv("MQTT_ECHO_PORT"))
-    if os.getenv("MQTT_ECHO_USERNAME"):
-        mqtt_echo_data["username"] = os.getenv("MQTT_ECHO_USERNAME")
-    if os.getenv("MQTT_ECHO_PASSWORD"):
-        mqtt_echo_data["password"] = os.getenv("MQTT_ECHO_PASSWORD")
-    if os.getenv("MQTT_ECHO_CLIENT_ID"):
-        mqtt_echo_data["client_id"] = os.getenv("MQTT_ECHO_CLIENT_ID")
-    if os.getenv("MQTT_ECHO_TOPIC_PREFIX"):
-        mqtt_echo_data["topic_prefix"] = os.getenv("MQTT_ECHO_TOPIC_PREFIX")
-    if os.getenv("MQTT_ECHO_QOS"):
-        mqtt_echo_data["qos"] = int(os.getenv("MQTT_ECHO_QOS"))
 
     mqtt_echo_config = MQTTEchoConfig(**mqtt_echo_data)
 
     # Parse season config
     season_data = data["season"]
-    if "start" not in season_data:
-        raise ValueError("season.start is required")
-    if "end" not in season_data:
-        raise ValueError("season.end is required")
 
     # Override with environment variables if set
-    if os.getenv("SEASON_START"):
-        season_data["start"] = os.getenv("SEASON_START")
-    if os.getenv("SEASON_END"):
-        season_data["end"] = os.getenv("SEASON_END")
+    _apply_env_overrides("season", season_data)
 
     # Parse dates (handle both date objects and strings)
     if isinstance(season_data["start"], str):
@@ -421,20 +523,9 @@ def load_config(config_path: Path | str) -> Config:
 
     # Parse S3 config
     s3_data = data["s3"]
-    if "bucket" not in s3_data:
-        raise ValueError("s3.bucket is required")
 
     # Override with environment variables if set
-    if os.getenv("S3_BUCKET"):
-        s3_data["bucket"] = os.getenv("S3_BUCKET")
-    if os.getenv("S3_JSON_KEY"):
-        s3_data["json_key"] = os.getenv("S3_JSON_KEY")
-    if os.getenv("S3_BACKUP_PREFIX"):
-        s3_data["backup_prefix"] = os.getenv("S3_BACKUP_PREFIX")
-    if os.getenv("AWS_ACCESS_KEY_ID"):
-        s3_data["aws_access_key_id"] = os.getenv("AWS_ACCESS_KEY_ID")
-    if os.getenv("AWS_SECRET_ACCESS_KEY"):
-        s3_data["aws_secret_access_key"] = os.getenv("AWS_SECRET_ACCESS_KEY")
+    _apply_env_overrides("s3", s3_data)
 
     s3_config = S3Config(**s3_data)
 
@@ -442,12 +533,7 @@ def load_config(config_path: Path | str) -> Config:
     upload_data = data.get("upload", {})
 
     # Override with environment variables if set
-    if os.getenv("UPLOAD_INTERVAL_SECONDS"):
-        upload_data["interval_seconds"] = int(os.getenv("UPLOAD_INTERVAL_SECONDS"))
-    if os.getenv("MINUTES_OF_DATA"):
-        upload_data["minutes_of_data"] = int(os.getenv("MINUTES_OF_DATA"))
-    if os.getenv("REPLAY_DELAY_SECONDS"):
-        upload_data["replay_delay_seconds"] = int(os.getenv("REPLAY_DELAY_SECONDS"))
+    _apply_env_overrides("upload", upload_data)
 
     upload_config = UploadConfig(**upload_data)
 
@@ -455,17 +541,14 @@ def load_config(config_path: Path | str) -> Config:
     backup_data = data.get("backup", {})
 
     # Override with environment variables if set
-    if os.getenv("BACKUP_DAY_OF_MONTH"):
-        backup_data["day_of_month"] = int(os.getenv("BACKUP_DAY_OF_MONTH"))
-    if os.getenv("BACKUP_HOUR"):
-        backup_data["hour"] = int(os.getenv("BACKUP_HOUR"))
+    _apply_env_overrides("backup", backup_data)
 
     backup_config = BackupConfig(**backup_data)
 
     return Config(
         mqtt=mqtt_config,
         database=database_config,
-        topics=topics,
+        topics=tuple(topics),
         logging=logging_config,
         alerting=alerting_config,
         yolink=yolink_config,
@@ -475,7 +558,3 @@ def load_config(config_path: Path | str) -> Config:
         upload=upload_config,
         backup=backup_config,
     )
-
-
-
-
@@ -1,7 +1,11 @@
 """MQTT client with automatic reconnection and message handling."""
 
+import asyncio
 import logging
+import queue
+import threading
 import time
+from collections.abc import Awaitable
 from typing import Callable
 
 import paho.mqtt.client as mqtt
@@ -10,6 +14,20 @@ from .config import MQTTConfig
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of messages buffered per dispatch worker
+DISPATCH_QUEUE_SIZE = 1024
+
+# Seconds disconnect() waits for each dispatch worker to drain its queue
+DISPATCH_JOIN_TIMEOUT = 10
+
+# Delay before sending subscriptions added while connected, so that a burst
+# of subscribe() calls goes out as a single SUBSCRIBE packet
+SUBSCRIBE_DEBOUNCE_SECONDS = 0.1
+
+# Reconnect backoff bounds for loop_asyncio() (matches paho's defaults)
+MIN_RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 120
+
 
 class MQTTLogger:
     """MQTT client that logs messages to a storage backend.
@@ -19,6 +37,8 @@ class MQTTLogger:
     - Configurable QoS levels
     - Support for multiple topic subscriptions
     - Callback-based message handling
+    - Optional dispatch workers that preserve per-topic ordering
+    - Optional asyncio network loop with coroutine callbacks
     
     Example:
         >>> def handle_message(topic, payload, qos, retain):
@@ -33,7 +53,12 @@ class MQTTLogger:
     def __init__(
         self,
         config: MQTTConfig,
-        message_callback: Callable[[str, bytes, int, bool], None],
+        message_callback: Callable[
+            [str, bytes, int, bool], None | Awaitable[None]
+        ],
+        dispatch_workers: int = 0,
+        message_callback_mv: Callable[[str, memoryview, int, bool], None]
+        | None = None,
     ):
         """Initialize the MQTT logger.
         
@@ -41,12 +66,40 @@ class MQTTLogger:
             config: MQTT configuration
             message_callback: Function called for each received message
                 Signature: callback(topic: str, payload: bytes, qos: int, retain: bool)
+                May be a coroutine function when running under loop_asyncio().
+            dispatch_workers: Number of threads used to run message_callback
+                (0 = run it directly on the network thread). Topics are sharded
+                across workers by hash, so messages on a topic stay in order.
+            message_callback_mv: Optional fast-path callback that receives the
+                payload as a memoryview instead of bytes, letting storage
+                backends write it without another copy. Used in place of
+                message_callback when provided.
         """
         self.config = config
         self.message_callback = message_callback
+        self.message_callback_mv = message_callback_mv
         self._subscriptions: list[tuple[str, int]] = []
         self._connected = False
         self._should_reconnect = True
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending_subscriptions: list[tuple[str, int]] = []
+        self._pending_lock = threading.Lock()
+        self._subscribe_scheduled = False
+
+        # Start dispatch workers, one queue per worker; None stops a worker
+        self._dispatch_queues: list[queue.Queue] = []
+        self._dispatch_threads: list[threading.Thread] = []
+        for i in range(dispatch_workers):
+            dispatch_queue: queue.Queue = queue.Queue(maxsize=DISPATCH_QUEUE_SIZE)
+            self._dispatch_queues.append(dispatch_queue)
+            thread = threading.Thread(
+                target=self._dispatch_loop,
+                args=(dispatch_queue,),
+                daemon=True,
+                name=f"MQTTDispatch-{i}",
+            )
+            thread.start()
+            self._dispatch_threads.append(thread)
         
         # Create MQTT client
         client_id = config.client_id or f"mqtt_logger_{int(time.time())}"
@@ -76,13 +129,60 @@ class MQTTLogger:
         qos = qos if qos is not None else self.config.qos
         self._subscriptions.append((topic, qos))
         
-        # Subscribe immediately if already connected
+        # Subscribe shortly if already connected, batching with other new topics
+        if self._connected:
+            with self._pending_lock:
+                self._pending_subscriptions.append((topic, qos))
+                if not self._subscribe_scheduled:
+                    self._subscribe_scheduled = True
+                    self._schedule_subscriptions()
+
+    def _schedule_subscriptions(self) -> None:
+        """Send pending subscriptions after the debounce delay.
+
+        Under loop_asyncio() the client's socket callbacks touch the event
+        loop, which is not thread-safe, so the send must run on the loop
+        thread rather than on a timer thread.
+        """
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(
+                loop.call_later,
+                SUBSCRIBE_DEBOUNCE_SECONDS,
+                self._send_pending_subscriptions,
+            )
+        else:
+            timer = threading.Timer(
+                SUBSCRIBE_DEBOUNCE_SECONDS, self._send_pending_subscriptions
+            )
+            timer.daemon = True
+            timer.start()
+
+    def _send_pending_subscriptions(self) -> None:
+        """Send subscriptions queued by subscribe() while connected."""
+        with self._pending_lock:
+            pending = self._pending_subscriptions
+            self._pending_subscriptions = []
+            self._subscribe_scheduled = False
+
         if self._connected:
-            result = self._client.subscribe(topic, qos)
-            if result[0] == mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"Subscribed to topic: {topic} (QoS {qos})")
-            else:
-                logger.error(f"Failed to subscribe to {topic}: {result}")
+            self._flush_subscriptions(pending)
+
+    def _flush_subscriptions(self, subscriptions: list[tuple[str, int]]) -> None:
+        """Send subscriptions to the broker in a single SUBSCRIBE packet.
+
+        Args:
+            subscriptions: (topic, qos) pairs to subscribe to
+        """
+        if not subscriptions:
+            return
+
+        topics = ", ".join(topic for topic, _ in subscriptions)
+        result, mid = self._client.subscribe(subscriptions)
+        if result == mqtt.MQTT_ERR_SUCCESS:
+            logger.info(f"Subscribed to {len(subscriptions)} topic(s): {topics}")
+        else:
+            logger.error(f"Failed to subscribe to {topics}: {result}")
     
     def connect(self) -> None:
         """Connect to the MQTT broker.
@@ -108,6 +208,22 @@ class MQTTLogger:
         self._should_reconnect = False
         self._client.disconnect()
         logger.info("Disconnected from MQTT broker")
+        self._stop_dispatch_workers()
+
+    def _stop_dispatch_workers(self) -> None:
+        """Let each dispatch worker deliver its queued messages, then stop it."""
+        queues, self._dispatch_queues = self._dispatch_queues, []
+        threads, self._dispatch_threads = self._dispatch_threads, []
+
+        for dispatch_queue in queues:
+            try:
+                dispatch_queue.put(None, timeout=DISPATCH_JOIN_TIMEOUT)
+            except queue.Full:
+                logger.warning("Dispatch queue still full, worker not stopped")
+        for thread in threads:
+            thread.join(timeout=DISPATCH_JOIN_TIMEOUT)
+            if thread.is_alive():
+                logger.warning(f"{thread.name} did not stop in time")
     
     def loop_forever(self) -> None:
         """Run the MQTT client loop (blocking).
@@ -132,6 +248,63 @@ class MQTTLogger:
         """Stop the background MQTT client loop."""
         self._client.loop_stop()
     
+    async def loop_asyncio(self) -> None:
+        """Run the MQTT client on the running asyncio event loop.
+
+        Socket I/O is driven by the event loop's reader/writer callbacks, so
+        messages are handled on the loop thread without a separate network
+        thread. Use this instead of connect() + loop_forever(); it connects,
+        reconnects with backoff, and returns once disconnect() is called.
+        """
+        self._loop = asyncio.get_running_loop()
+        loop = self._loop
+        client = self._client
+
+        client.on_socket_open = lambda c, userdata, sock: loop.add_reader(
+            sock, c.loop_read
+        )
+        client.on_socket_close = lambda c, userdata, sock: loop.remove_reader(sock)
+        client.on_socket_register_write = lambda c, userdata, sock: loop.add_writer(
+            sock, c.loop_write
+        )
+        client.on_socket_unregister_write = (
+            lambda c, userdata, sock: loop.remove_writer(sock)
+        )
+
+        reconnect_delay = MIN_RECONNECT_DELAY
+        needs_connect = True
+        try:
+            while self._should_reconnect:
+                # The first connect retries too, so a broker that is down at
+                # startup is waited for rather than raising
+                if needs_connect or client.loop_misc() == mqtt.MQTT_ERR_NO_CONN:
+                    try:
+                        if needs_connect:
+                            self.connect()
+                        else:
+                            client.reconnect()
+                        needs_connect = False
+                        reconnect_delay = MIN_RECONNECT_DELAY
+                    except OSError as e:
+                        logger.warning(
+                            f"MQTT connect failed: {e}, retrying in {reconnect_delay}s"
+                        )
+                        await asyncio.sleep(reconnect_delay)
+                        reconnect_delay = min(reconnect_delay * 2, MAX_RECONNECT_DELAY)
+                        continue
+                await asyncio.sleep(1)
+        finally:
+            # Detach from the event loop so it holds no callbacks for the socket
+            sock = client.socket()
+            if sock is not None:
+                loop.remove_reader(sock)
+                loop.remove_writer(sock)
+            client.on_socket_open = None
+            client.on_socket_close = None
+            client.on_socket_register_write = None
+            client.on_socket_unregister_write = None
+            self._loop = None
+
     def _on_connect(
         self,
         client: mqtt.Client,
@@ -145,13 +318,10 @@ class MQTTLogger:
             self._connected = True
             logger.info("Connected to MQTT broker")
             
-            # Subscribe to all topics
-            for topic, qos in self._subscriptions:
-                result = self._client.subscribe(topic, qos)
-                if result[0] == mqtt.MQTT_ERR_SUCCESS:
-                    logger.info(f"Subscribed to topic: {topic} (QoS {qos})")
-                else:
-                    logger.error(f"Failed to subscribe to {topic}: {result}")
+            # Subscribe to all topics; this covers anything still pending
+            with self._pending_lock:
+                self._pending_subscriptions = []
+            self._flush_subscriptions(self._subscriptions)
         else:
             logger.error(f"Connection failed with reason code: {reason_code}")
     
@@ -176,6 +346,47 @@ class MQTTLogger:
             if self._should_reconnect:
                 logger.info("Automatic reconnection will be attempted")
     
+    def _dispatch_loop(self, dispatch_queue: queue.Queue) -> None:
+        """Deliver queued messages to the callback in arrival order.
+
+        Args:
+            dispatch_queue: Queue owned by this worker
+        """
+        while True:
+            item = dispatch_queue.get()
+            if item is None:
+                return
+            topic, payload, qos, retain = item
+            try:
+                self._deliver(topic, payload, qos, retain)
+            except Exception as e:
+                logger.error(f"Error processing message on {topic}: {e}")
+
+    def _deliver(self, topic: str, payload: bytes, qos: int, retain: bool) -> None:
+        """Invoke the message callback, scheduling it if it is a coroutine."""
+        if self.message_callback_mv is not None:
+            self.message_callback_mv(topic, memoryview(payload), qos, retain)
+            return
+
+        result = self.message_callback(topic, payload, qos, retain)
+        if not asyncio.iscoroutine(result):
+            return
+
+        if self._loop is None:
+            result.close()
+            logger.error("Coroutine message callbacks require loop_asyncio()")
+            return
+
+        def log_failure(future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(
+                    f"Error processing message on {topic}: {future.exception()}"
+                )
+
+        asyncio.run_coroutine_threadsafe(result, self._loop).add_done_callback(
+            log_failure
+        )
+
     def _on_message(
         self,
         client: mqtt.Client,
@@ -184,12 +395,32 @@ class MQTTLogger:
     ) -> None:
         """Callback for received messages."""
         try:
-            logger.debug(
-                f"Received message on {message.topic} "
-                f"(QoS {message.qos}, retain={message.retain})"
-            )
+            # Hot path: skip formatting entirely unless DEBUG is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Received message on %s (QoS %d, retain=%s)",
+                    message.topic,
+                    message.qos,
+                    message.retain,
+                )
             
-            self.message_callback(
+            # Read once: disconnect() swaps in an empty list once the
+            # workers stop, after which messages are delivered directly
+            dispatch_queues = self._dispatch_queues
+            if dispatch_queues:
+                # Same topic always lands on the same worker to keep ordering
+                shard = hash(message.topic) % len(dispatch_queues)
+                try:
+                    dispatch_queues[shard].put_nowait(
+                        (message.topic, message.payload, message.qos, message.retain)
+                    )
+                except queue.Full:
+                    logger.warning(
+                        f"Dispatch queue full, dropping message on {message.topic}"
+                    )
+                return
+
+            self._deliver(
                 message.topic,
                 message.payload,
                 message.qos,
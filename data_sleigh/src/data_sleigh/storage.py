@@ -2,14 +2,31 @@
 
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import duckdb
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Columns written by flush, in batch buffer order
+MESSAGE_COLUMNS = ("timestamp", "topic", "payload", "qos", "retain")
+YOLINK_COLUMNS = (
+    "timestamp",
+    "topic",
+    "device_id",
+    "device_type",
+    "temperature",
+    "humidity",
+    "battery",
+    "signal",
+    "raw_json",
+)
+
 
 class MessageStore:
     """DuckDB-backed storage for MQTT messages and YoLink sensor data.
@@ -18,6 +35,7 @@ class MessageStore:
         db_path: Path to the DuckDB database file
         batch_size: Number of messages to batch before writing
         flush_interval: Seconds between forced flushes
+        checkpoint_every: Number of flushed messages between WAL checkpoints
 
     Example:
         >>> store = MessageStore("data/mqtt.db", batch_size=50)
@@ -32,6 +50,7 @@ class MessageStore:
         db_path: str | Path,
         batch_size: int = 100,
         flush_interval: int = 10,
+        checkpoint_every: int = 10_000,
     ):
         """Initialize the message store.
 
@@ -39,12 +58,22 @@ class MessageStore:
             db_path: Path to the DuckDB database file
             batch_size: Number of messages to batch before writing
             flush_interval: Seconds between forced flushes
+            checkpoint_every: Number of flushed messages between WAL checkpoints
         """
         self.db_path = Path(db_path)
         self.batch_size = batch_size
         self.flush_interval = flush_interval
-        self._batches: dict[str, list[dict[str, Any]]] = {}
-        self._last_flush: dict[str, datetime] = {}
+        self.checkpoint_every = checkpoint_every
+        self._messages_since_checkpoint = 0
+        # Pending rows per table, one list per column
+        self._batches: dict[str, tuple[list[Any], ...]] = {}
+        # Guards _batches: inserts append under it, flush swaps batches out
+        self._batch_lock = threading.Lock()
+        self._columns: dict[str, tuple[str, ...]] = {}
+        # Table names already checked by _validate_table_name
+        self._valid_tables: set[str] = set()
+        # time.monotonic() by which each table must next be flushed
+        self._flush_deadline: dict[str, float] = {}
 
         # Ensure parent directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -59,6 +88,22 @@ class MessageStore:
 
         logger.info(f"Connected to DuckDB at {self.db_path} (SD card optimized)")
 
+    def _validate_table_name(self, table_name: str) -> None:
+        """Reject table names that are unsafe to interpolate into SQL.
+
+        Args:
+            table_name: Table name to check
+
+        Raises:
+            ValueError: If the name has characters other than letters,
+                digits and underscores
+        """
+        if table_name in self._valid_tables:
+            return
+        if not table_name.replace("_", "").isalnum():
+            raise ValueError(f"Invalid table name: {table_name}")
+        self._valid_tables.add(table_name)
+
     def create_table(self, table_name: str) -> None:
         """Create a table for storing MQTT messages if it doesn't exist.
 
@@ -74,8 +119,7 @@ class MessageStore:
         - retain: Whether message was retained
         """
         # Validate table name to prevent SQL injection
-        if not table_name.replace("_", "").isalnum():
-            raise ValueError(f"Invalid table name: {table_name}")
+        self._validate_table_name(table_name)
 
         # Create sequence for auto-incrementing IDs
         seq_name = f"{table_name}_id_seq"
@@ -105,8 +149,9 @@ class MessageStore:
 
         # Initialize batch tracking
         if table_name not in self._batches:
-            self._batches[table_name] = []
-            self._last_flush[table_name] = datetime.now()
+            self._columns[table_name] = MESSAGE_COLUMNS
+            self._batches[table_name] = tuple([] for _ in MESSAGE_COLUMNS)
+            self._flush_deadline[table_name] = time.monotonic() + self.flush_interval
 
         logger.info(f"Table '{table_name}' ready")
 
@@ -129,8 +174,7 @@ class MessageStore:
         - raw_json: Complete event data as JSON string (for debugging)
         """
         # Validate table name
-        if not table_name.replace("_", "").isalnum():
-            raise ValueError(f"Invalid table name: {table_name}")
+        self._validate_table_name(table_name)
 
         # Create sequence for auto-incrementing IDs
         seq_name = f"{table_name}_id_seq"
@@ -175,8 +219,9 @@ class MessageStore:
 
         # Initialize batch tracking
         if table_name not in self._batches:
-            self._batches[table_name] = []
-            self._last_flush[table_name] = datetime.now()
+            self._columns[table_name] = YOLINK_COLUMNS
+            self._batches[table_name] = tuple([] for _ in YOLINK_COLUMNS)
+            self._flush_deadline[table_name] = time.monotonic() + self.flush_interval
 
         logger.info(f"YoLink table '{table_name}' ready with normalized schema")
 
@@ -187,6 +232,7 @@ class MessageStore:
         payload: bytes,
         qos: int = 0,
         retain: bool = False,
+        timestamp: datetime | None = None,
     ) -> None:
         """Insert a message into the database (batched).
 
@@ -196,29 +242,63 @@ class MessageStore:
             payload: Message payload
             qos: Quality of Service level
             retain: Whether message was retained
+            timestamp: Receipt time, if the caller already has it (default: now)
+        """
+        decoded = self._decode_payload(topic, payload)
+        with self._batch_lock:
+            timestamps, topics, payloads, qoss, retains = self._batches[table_name]
+            timestamps.append(timestamp or datetime.now())
+            topics.append(topic)
+            payloads.append(decoded)
+            qoss.append(qos)
+            retains.append(retain)
+
+        self._flush_if_due(table_name)
+
+    def insert_batch(
+        self,
+        table_name: str,
+        messages: list[tuple[datetime, str, bytes, int, bool]],
+    ) -> None:
+        """Insert several already-received messages at once (batched).
+
+        The whole batch triggers at most one flush.
+
+        Args:
+            table_name: Target table name
+            messages: (receipt timestamp, topic, payload, qos, retain) tuples
         """
-        # Decode payload to string (assuming UTF-8, with fallback)
+        if not messages:
+            return
+
+        new_timestamps, new_topics, new_payloads, new_qoss, new_retains = zip(
+            *messages, strict=True
+        )
+        decoded = list(map(self._decode_payload, new_topics, new_payloads))
+        with self._batch_lock:
+            timestamps, topics, payloads, qoss, retains = self._batches[table_name]
+            timestamps.extend(new_timestamps)
+            topics.extend(new_topics)
+            payloads.extend(decoded)
+            qoss.extend(new_qoss)
+            retains.extend(new_retains)
+
+        self._flush_if_due(table_name)
+
+    @staticmethod
+    def _decode_payload(topic: str, payload: bytes) -> str:
+        """Decode a payload to text, falling back to hex for non-UTF-8 data."""
         try:
-            payload_str = payload.decode("utf-8")
+            return payload.decode("utf-8")
         except UnicodeDecodeError:
-            payload_str = payload.hex()
             logger.warning(f"Non-UTF-8 payload on {topic}, stored as hex")
+            return payload.hex()
 
-        message = {
-            "timestamp": datetime.now(),
-            "topic": topic,
-            "payload": payload_str,
-            "qos": qos,
-            "retain": retain,
-        }
-
-        self._batches[table_name].append(message)
-
-        # Check if we should flush
+    def _flush_if_due(self, table_name: str) -> None:
+        """Flush a table once its batch is full or the flush interval passed."""
         should_flush = (
-            len(self._batches[table_name]) >= self.batch_size
-            or (datetime.now() - self._last_flush[table_name]).total_seconds()
-            >= self.flush_interval
+            len(self._batches[table_name][0]) >= self.batch_size
+            or time.monotonic() >= self._flush_deadline[table_name]
         )
 
         if should_flush:
@@ -250,29 +330,22 @@ class MessageStore:
         # Create synthetic topic for consistency with MQTT pattern
         topic = f"yolink/{device_type}/{device_id}"
 
-        message = {
-            "timestamp": datetime.now(),
-            "topic": topic,
-            "device_id": device_id,
-            "device_type": device_type,
-            "temperature": temperature,
-            "humidity": humidity,
-            "battery": battery,
-            "signal": signal,
-            "raw_json": json.dumps(raw_data),
-        }
-
-        self._batches[table_name].append(message)
-
-        # Check if we should flush
-        should_flush = (
-            len(self._batches[table_name]) >= self.batch_size
-            or (datetime.now() - self._last_flush[table_name]).total_seconds()
-            >= self.flush_interval
+        row = (
+            datetime.now(),
+            topic,
+            device_id,
+            device_type,
+            temperature,
+            humidity,
+            battery,
+            signal,
+            json.dumps(raw_data),
         )
+        with self._batch_lock:
+            for column, value in zip(self._batches[table_name], row, strict=True):
+                column.append(value)
 
-        if should_flush:
-            self.flush(table_name)
+        self._flush_if_due(table_name)
 
     def flush(self, table_name: str | None = None) -> None:
         """Flush pending messages to the database.
@@ -285,73 +358,60 @@ class MessageStore:
         )
 
         for tbl in tables_to_flush:
-            if not self._batches.get(tbl):
-                continue
-
-            messages = self._batches[tbl]
-
-            # Validate table name
-            if not tbl.replace("_", "").isalnum():
-                logger.error(f"Invalid table name: {tbl}")
-                continue
+            columns = self._columns.get(tbl)
+            # Swap the pending rows out in one step so an insert from another
+            # thread lands in the fresh batch instead of being dropped
+            with self._batch_lock:
+                # Only tables validated by create_*table have a batch
+                batch = self._batches.get(tbl)
+                if not batch or not batch[0]:
+                    continue
+                self._batches[tbl] = tuple([] for _ in columns)
+
+            count = len(batch[0])
 
             try:
-                # Check if this is a YoLink table (has device_id field)
-                if messages and "device_id" in messages[0]:
-                    # YoLink table insert
-                    self._conn.executemany(
-                        f"""
-                        INSERT INTO {tbl} (timestamp, topic, device_id, device_type,
-                                          temperature, humidity, battery, signal, raw_json)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        [
-                            (
-                                msg["timestamp"],
-                                msg["topic"],
-                                msg["device_id"],
-                                msg["device_type"],
-                                msg["temperature"],
-                                msg["humidity"],
-                                msg["battery"],
-                                msg["signal"],
-                                msg["raw_json"],
-                            )
-                            for msg in messages
-                        ],
-                    )
-                else:
-                    # Standard MQTT message table insert
-                    self._conn.executemany(
-                        f"""
-                        INSERT INTO {tbl} (timestamp, topic, payload, qos, retain)
-                        VALUES (?, ?, ?, ?, ?)
-                        """,
-                        [
-                            (
-                                msg["timestamp"],
-                                msg["topic"],
-                                msg["payload"],
-                                msg["qos"],
-                                msg["retain"],
-                            )
-                            for msg in messages
-                        ],
+                # Insert the whole batch as one DataFrame. Naming the columns
+                # lets the id default apply; append(by_name=True) would too,
+                # but needs a newer DuckDB than the declared minimum
+                frame = pd.DataFrame(dict(zip(columns, batch, strict=True)))
+                view = f"_flush_{tbl}"
+                self._conn.register(view, frame)
+                try:
+                    self._conn.execute(
+                        f"INSERT INTO {tbl} ({', '.join(columns)}) "
+                        f"SELECT * FROM {view}"
                     )
-
+                finally:
+                    self._conn.unregister(view)
                 self._conn.commit()
 
-                # Explicitly checkpoint to merge WAL into main database file
-                # Without this, the WAL grows indefinitely due to our aggressive PRAGMA settings
-                self._conn.execute("CHECKPOINT")
+                logger.debug(f"Flushed {count} messages to table '{tbl}'")
 
-                logger.debug(f"Flushed {len(messages)} messages to table '{tbl}'")
+                self._flush_deadline[tbl] = time.monotonic() + self.flush_interval
 
-                self._batches[tbl] = []
-                self._last_flush[tbl] = datetime.now()
+                self._messages_since_checkpoint += count
 
             except Exception as e:
                 logger.error(f"Failed to flush messages to '{tbl}': {e}")
+                # Put the rows back ahead of any that arrived meanwhile so
+                # the next flush retries them in order
+                with self._batch_lock:
+                    for column, pending in zip(self._batches[tbl], batch, strict=True):
+                        column[:0] = pending
+
+        # The PRAGMAs above hold the WAL back, so merge it into the main
+        # database file periodically rather than on every flush
+        if self._messages_since_checkpoint >= self.checkpoint_every:
+            try:
+                self.checkpoint()
+            except Exception as e:
+                logger.warning(f"Checkpoint failed: {e}")
+
+    def checkpoint(self) -> None:
+        """Merge the WAL into the main database file."""
+        self._conn.execute("CHECKPOINT")
+        self._messages_since_checkpoint = 0
 
     def query(
         self,
@@ -360,7 +420,8 @@ class MessageStore:
         end_time: datetime | None = None,
         topic_filter: str | None = None,
         limit: int | None = None,
-    ) -> list[dict[str, Any]]:
+        as_frame: bool = False,
+    ) -> list[dict[str, Any]] | pd.DataFrame:
         """Query messages from the database.
 
         Args:
@@ -369,13 +430,14 @@ class MessageStore:
             end_time: Optional end timestamp filter
             topic_filter: Optional topic pattern (SQL LIKE syntax)
             limit: Optional maximum number of results
+            as_frame: Return a DataFrame fetched column-wise instead of
+                building one dictionary per row
 
         Returns:
-            List of message dictionaries
+            List of message dictionaries, or a DataFrame if as_frame is set
         """
         # Validate table name
-        if not table_name.replace("_", "").isalnum():
-            raise ValueError(f"Invalid table name: {table_name}")
+        self._validate_table_name(table_name)
 
         query = f"SELECT * FROM {table_name} WHERE 1=1"
         params = []
@@ -397,6 +459,9 @@ class MessageStore:
         if limit:
             query += f" LIMIT {limit}"
 
+        if as_frame:
+            return self._conn.execute(query, params).df()
+
         result = self._conn.execute(query, params).fetchall()
 
         # Convert to dictionaries - get actual column names from result
@@ -413,8 +478,7 @@ class MessageStore:
             Dictionary with count, first_message, last_message, etc.
         """
         # Validate table name
-        if not table_name.replace("_", "").isalnum():
-            raise ValueError(f"Invalid table name: {table_name}")
+        self._validate_table_name(table_name)
 
         stats = {}
 
@@ -460,7 +524,7 @@ class MessageStore:
 
         # Final checkpoint to ensure WAL is fully merged into main database
         try:
-            self._conn.execute("CHECKPOINT")
+            self.checkpoint()
             logger.info("Final checkpoint completed - WAL merged to main database")
         except Exception as e:
             logger.warning(f"Final checkpoint failed: {e}")
@@ -0,0 +1,108 @@
+"""MQTT topic pattern matching."""
+
+
+class _TrieNode:
+    """A single topic level in a TopicTrie."""
+
+    __slots__ = ("children", "single", "value", "multi")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.single: _TrieNode | None = None
+        # (priority, table_name) for patterns ending here or in "/#" here
+        self.value: tuple[int, str] | None = None
+        self.multi: tuple[int, str] | None = None
+
+
+class TopicTrie:
+    """Map MQTT topics to table names through their subscription patterns.
+
+    Patterns are split into levels once and stored in a trie, so a lookup
+    walks the topic's levels instead of testing every pattern. When several
+    patterns match, the one added first wins, mirroring a linear scan over
+    the configured topics.
+
+    Example:
+        >>> trie = TopicTrie()
+        >>> trie.add("sensors/+/temp", "temps")
+        >>> trie.add("sensors/#", "sensors")
+        >>> trie.match("sensors/kitchen/temp")
+        'temps'
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty trie."""
+        self._root = _TrieNode()
+        self._count = 0
+        # Deepest level any pattern descends to, excluding a trailing "#"
+        self._max_depth = 0
+
+    def add(self, pattern: str | tuple[str, ...], table_name: str) -> None:
+        """Add a subscription pattern.
+
+        Args:
+            pattern: MQTT topic pattern (+ for single level, # for multi-level),
+                or the pattern already split into levels
+            table_name: Value returned for topics matching the pattern
+        """
+        priority = self._count
+        self._count += 1
+
+        parts = pattern.split("/") if isinstance(pattern, str) else pattern
+
+        # "#" is only valid as the last level; such patterns never match
+        if "#" in parts[:-1]:
+            return
+
+        self._max_depth = max(self._max_depth, len(parts) - (parts[-1] == "#"))
+
+        node = self._root
+        for part in parts:
+            if part == "#":
+                if node.multi is None:
+                    node.multi = (priority, table_name)
+                return
+            if part == "+":
+                if node.single is None:
+                    node.single = _TrieNode()
+                node = node.single
+            else:
+                node = node.children.setdefault(part, _TrieNode())
+
+        if node.value is None:
+            node.value = (priority, table_name)
+
+    def match(self, topic: str) -> str | None:
+        """Find the table for a topic.
+
+        Args:
+            topic: Actual MQTT topic
+
+        Returns:
+            Table name of the first matching pattern, or None if none match
+        """
+        # Levels below the deepest pattern can only be covered by a "#", so
+        # leave them unsplit in a final remainder element
+        parts = topic.split("/", self._max_depth)
+        best: tuple[int, str] | None = None
+        stack = [(self._root, 0)]
+
+        while stack:
+            node, depth = stack.pop()
+
+            # "#" also matches the parent level itself ("a/#" matches "a")
+            if node.multi is not None and (best is None or node.multi < best):
+                best = node.multi
+
+            if depth == len(parts):
+                if node.value is not None and (best is None or node.value < best):
+                    best = node.value
+                continue
+
+            child = node.children.get(parts[depth])
+            if child is not None:
+                stack.append((child, depth + 1))
+            if node.single is not None:
+                stack.append((node.single, depth + 1))
+
+        return best[1] if best else None
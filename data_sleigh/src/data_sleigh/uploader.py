@@ -4,14 +4,29 @@ import gzip
 import json
 import logging
 import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Any
 
 import boto3
+import orjson
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# Background uploads run one at a time so an older snapshot can never finish
+# after (and overwrite) a newer one; queued uploads to a key are coalesced.
+# The executor is created under _pending_lock by the first async upload.
+_upload_executor: ThreadPoolExecutor | None = None
+_pending_lock = threading.Lock()
+_pending_uploads: dict[tuple[str, str], tuple[Future, dict[str, Any]]] = {}
+
+# Interval metadata shared by the aggregate series in create_json_output
+_AGG_1M_META = {"interval_minutes": 1, "lookback_hours": 1}
+_AGG_5M_META = {"interval_minutes": 5, "lookback_hours": 24}
+_AGG_1H_META = {"interval_minutes": 60, "lookback_hours": None}  # All historical data
+
 
 def read_from_s3(
     bucket: str,
@@ -72,9 +87,9 @@ def calculate_stats(measurements: list[dict[str, Any]]) -> dict[str, float]:
         return {}
 
     levels = [
-        m["water_level_mm"]
+        level
         for m in measurements
-        if m["water_level_mm"] is not None
+        if (level := m.get("water_level_mm")) is not None
     ]
 
     if not levels:
@@ -145,25 +160,13 @@ def create_json_output(
     # Format: compact key names for gzip efficiency
     # t=timestamp, m=mean, s=stddev, n=count, min/max=range
     if aggregates_1m:
-        output["agg_1m"] = {
-            "interval_minutes": 1,
-            "lookback_hours": 1,
-            "data": aggregates_1m,
-        }
+        output["agg_1m"] = {**_AGG_1M_META, "data": aggregates_1m}
 
     if aggregates_5m:
-        output["agg_5m"] = {
-            "interval_minutes": 5,
-            "lookback_hours": 24,
-            "data": aggregates_5m,
-        }
+        output["agg_5m"] = {**_AGG_5M_META, "data": aggregates_5m}
 
     if aggregates_1h:
-        output["agg_1h"] = {
-            "interval_minutes": 60,
-            "lookback_hours": None,  # All historical data
-            "data": aggregates_1h,
-        }
+        output["agg_1h"] = {**_AGG_1H_META, "data": aggregates_1h}
 
     # Add segment analysis if available
     if analysis:
@@ -176,22 +179,19 @@ def create_json_output(
     def add_yolink_interval(
         key: str,
         data: dict[str, list] | None,
-        interval_minutes: int,
-        lookback_hours: int | None,
+        meta: dict[str, int | None],
     ):
         if data and (data.get("air") or data.get("water")):
-            yolink_data[key] = {
-                "interval_minutes": interval_minutes,
-                "lookback_hours": lookback_hours,
-            }
+            interval = {**meta}
             if data.get("air"):
-                yolink_data[key]["air"] = data["air"]
+                interval["air"] = data["air"]
             if data.get("water"):
-                yolink_data[key]["water"] = data["water"]
+                interval["water"] = data["water"]
+            yolink_data[key] = interval
 
-    add_yolink_interval("agg_1m", yolink_1m, 1, 1)
-    add_yolink_interval("agg_5m", yolink_5m, 5, 24)
-    add_yolink_interval("agg_1h", yolink_1h, 60, None)
+    add_yolink_interval("agg_1m", yolink_1m, _AGG_1M_META)
+    add_yolink_interval("agg_5m", yolink_5m, _AGG_5M_META)
+    add_yolink_interval("agg_1h", yolink_1h, _AGG_1H_META)
 
     if yolink_data:
         output["yolink_sensors"] = yolink_data
@@ -207,17 +207,20 @@ def upload_to_s3(
     aws_secret_key: str,
     cache_control: str = "public, max-age=30",
     verbose: bool = True,
+    format: str = "json",
 ) -> None:
-    """Upload JSON data to S3 with gzip compression.
+    """Upload data to S3 with gzip compression.
 
     Args:
-        data: Dictionary to upload as JSON
+        data: Dictionary to upload
         bucket: S3 bucket name
         key: S3 object key
         aws_access_key: AWS access key ID
         aws_secret_key: AWS secret access key
         cache_control: Cache-Control header value
         verbose: Whether to print detailed upload info
+        format: Payload encoding, "json" (default) or "msgpack" (requires the
+            optional ormsgpack package, install with data-sleigh[msgpack])
 
     Raises:
         Exception: If upload fails
@@ -229,14 +232,24 @@ def upload_to_s3(
             aws_secret_access_key=aws_secret_key,
         )
 
-        # Serialize to JSON
-        json_content = json.dumps(data, indent=2)
+        # Serialize straight to bytes (no intermediate str to re-encode).
+        # The analyzer's results can hold numpy scalars (e.g. np.float64)
+        if format == "json":
+            raw_content = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+            content_type = "application/json"
+        elif format == "msgpack":
+            import ormsgpack
+
+            raw_content = ormsgpack.packb(data, option=ormsgpack.OPT_SERIALIZE_NUMPY)
+            content_type = "application/msgpack"
+        else:
+            raise ValueError(f"Unsupported upload format: {format}")
 
         # Gzip compress the content
-        compressed_content = gzip.compress(json_content.encode("utf-8"))
+        compressed_content = gzip.compress(raw_content)
 
         # Calculate compression ratio
-        original_size = len(json_content.encode("utf-8"))
+        original_size = len(raw_content)
         compressed_size = len(compressed_content)
         ratio = (1 - compressed_size / original_size) * 100
 
@@ -244,7 +257,7 @@ def upload_to_s3(
             Bucket=bucket,
             Key=key,
             Body=compressed_content,
-            ContentType="application/json",
+            ContentType=content_type,
             ContentEncoding="gzip",  # Critical: tells browser to decompress
             CacheControl=cache_control,
             # Note: Public access is controlled by bucket policy, not object ACL
@@ -263,5 +276,59 @@ def upload_to_s3(
         raise
 
 
+def upload_to_s3_async(
+    data: dict[str, Any],
+    bucket: str,
+    key: str,
+    aws_access_key: str,
+    aws_secret_key: str,
+    cache_control: str = "public, max-age=30",
+    verbose: bool = True,
+    format: str = "json",
+) -> Future:
+    """Upload data to S3 (JSON or msgpack) in a background thread.
+
+    Takes the same arguments as upload_to_s3() but returns immediately.
+    Uploads run one at a time, in submission order. If an upload to the same
+    bucket/key is still waiting to start, its data is replaced with this newer
+    data and the existing future is returned, so only the latest snapshot is
+    ever sent.
+
+    Returns:
+        Future that resolves when the upload completes (or raises on failure)
+    """
+    target = (bucket, key)
+    kwargs = {
+        "data": data,
+        "bucket": bucket,
+        "key": key,
+        "aws_access_key": aws_access_key,
+        "aws_secret_key": aws_secret_key,
+        "cache_control": cache_control,
+        "verbose": verbose,
+        "format": format,
+    }
+
+    with _pending_lock:
+        pending = _pending_uploads.get(target)
+        if pending is not None:
+            future = pending[0]
+            _pending_uploads[target] = (future, kwargs)
+            return future
+
+        global _upload_executor
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="S3Upload"
+            )
+        future = _upload_executor.submit(_run_pending_upload, target)
+        _pending_uploads[target] = (future, kwargs)
+        return future
+
 
+def _run_pending_upload(target: tuple[str, str]) -> None:
+    """Upload the most recent data queued for a bucket/key."""
+    with _pending_lock:
+        _, kwargs = _pending_uploads.pop(target)
 
+    upload_to_s3(**kwargs)
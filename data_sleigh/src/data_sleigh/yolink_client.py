@@ -5,14 +5,15 @@ library to receive real-time sensor data from air and water temperature sensors.
 """
 
 import asyncio
-import json
 import logging
 import threading
+import time
+from collections import deque
 from collections.abc import Callable
-from datetime import UTC, datetime, timedelta
 
 import aiohttp
 import aiomqtt
+import orjson
 from yolink.auth_mgr import YoLinkAuthMgr
 from yolink.client import YoLinkClient as YoLinkAPIClient
 from yolink.const import OAUTH2_TOKEN
@@ -22,6 +23,26 @@ from .config import YoLinkConfig
 
 logger = logging.getLogger(__name__)
 
+# Refresh the token this long before it expires (seconds)
+TOKEN_EXPIRY_BUFFER = 300
+# Background refresh runs this long before the refresh deadline (seconds)
+TOKEN_PREFETCH_SECONDS = 60
+# Retry delay after a failed background refresh (seconds)
+TOKEN_RETRY_SECONDS = 30
+
+# Parsed reports waiting for _process_message; newer ones are dropped when full
+MESSAGE_QUEUE_SIZE = 256
+
+# Batched sensor callback: flush at this many readings or after this long
+SENSOR_BATCH_SIZE = 32
+SENSOR_BATCH_INTERVAL = 0.1
+# Oldest readings are dropped if the batch callback falls this far behind
+SENSOR_BATCH_MAX_PENDING = 1024
+
+SensorReading = tuple[
+    str, str, float | None, float | None, int | None, int | None, dict
+]
+
 
 class YoLinkAuthManager(YoLinkAuthMgr):
     """Authentication manager for YoLink API using OAuth2 client credentials.
@@ -43,7 +64,9 @@ class YoLinkAuthManager(YoLinkAuthMgr):
         self._uaid = uaid
         self._secret_key = secret_key
         self._access_token: str | None = None
-        self._token_expires_at: datetime | None = None
+        # time.monotonic() after which the token must be refreshed
+        self._token_refresh_after = 0.0
+        self._refresh_task: asyncio.Task | None = None
 
     def access_token(self) -> str:
         """Return the current access token."""
@@ -55,15 +78,54 @@ class YoLinkAuthManager(YoLinkAuthMgr):
         Returns:
             The current valid access token
         """
-        # Refresh if no token or token expires within 5 minutes
+        # Fast path: token present and not yet inside the expiry buffer
         if (
-            self._access_token is None
-            or self._token_expires_at is None
-            or datetime.now(UTC) >= self._token_expires_at - timedelta(minutes=5)
+            self._access_token is not None
+            and time.monotonic() < self._token_refresh_after
         ):
-            await self._fetch_token()
+            return self._access_token
+
+        await self._fetch_token()
         return self._access_token
 
+    def start_background_refresh(self) -> None:
+        """Refresh the token in the background shortly before it is due.
+
+        Keeps check_and_refresh_token() from blocking on HTTP when the
+        MQTT connection needs to reconnect.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop_background_refresh(self) -> None:
+        """Cancel the background refresh task, if running."""
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _refresh_loop(self) -> None:
+        """Fetch a new token ahead of each refresh deadline."""
+        while True:
+            delay = (
+                self._token_refresh_after - TOKEN_PREFETCH_SECONDS - time.monotonic()
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await self._fetch_token()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Any failure here would otherwise end the task silently
+                logger.error(
+                    f"Background YoLink token refresh failed: {e}", exc_info=True
+                )
+                await asyncio.sleep(TOKEN_RETRY_SECONDS)
+
     async def _fetch_token(self) -> None:
         """Fetch a new access token from YoLink OAuth2 endpoint."""
         logger.debug("Fetching new YoLink access token...")
@@ -75,6 +137,11 @@ class YoLinkAuthManager(YoLinkAuthMgr):
                 "client_secret": self._secret_key,
             },
         ) as response:
+            # Check the status first so error bodies are never parsed as a token
+            if response.status >= 400:
+                text = await response.text()
+                raise ValueError(f"YoLink auth HTTP {response.status}: {text[:200]}")
+
             data = await response.json()
 
             # Check for error response
@@ -83,12 +150,12 @@ class YoLinkAuthManager(YoLinkAuthMgr):
                 error_desc = data.get("error_description", data.get("msg", str(data)))
                 raise ValueError(f"YoLink auth failed: {error} - {error_desc}")
 
-            response.raise_for_status()
-
             self._access_token = data["access_token"]
             # Token typically expires in 7200 seconds (2 hours)
             expires_in = data.get("expires_in", 7200)
-            self._token_expires_at = datetime.now(UTC) + timedelta(seconds=expires_in)
+            self._token_refresh_after = time.monotonic() + (
+                expires_in - TOKEN_EXPIRY_BUFFER
+            )
             logger.info(f"YoLink token acquired, expires in {expires_in}s")
 
 
@@ -104,6 +171,7 @@ class YoLinkClient:
     - Device ID filtering to process only configured sensors
     - Separate handling for air sensor (temp + humidity) and water sensor (temp only)
     - Optional echo callback for forwarding ALL messages to a local MQTT broker
+    - Runs in a background thread (start) or on an existing event loop (start_async)
 
     Example:
         >>> def on_sensor_data(device_type, device_id, temperature, humidity, battery, signal, raw_data):
@@ -120,6 +188,7 @@ class YoLinkClient:
             [str, str, float | None, float | None, int | None, int | None, dict], None
         ],
         echo_callback: Callable[[str, bytes], None] | None = None,
+        sensor_callback_batch: Callable[[list[SensorReading]], None] | None = None,
     ):
         """Initialize the YoLink client.
 
@@ -138,31 +207,82 @@ class YoLinkClient:
                 Signature: callback(topic, payload)
                 - topic: The full MQTT topic string
                 - payload: The raw message payload bytes
+            sensor_callback_batch: Optional function called with lists of readings
+                instead of calling sensor_callback once per reading. Each reading
+                is a tuple of sensor_callback's arguments. Readings are flushed
+                every SENSOR_BATCH_SIZE readings or SENSOR_BATCH_INTERVAL seconds.
         """
         self.config = config
         self.sensor_callback = sensor_callback
         self.echo_callback = echo_callback
+        self.sensor_callback_batch = sensor_callback_batch
+        self._batch: deque[SensorReading] = deque(maxlen=SENSOR_BATCH_MAX_PENDING)
+        # Set when a reading lands in an empty batch / when the batch is full
+        self._batch_pending: asyncio.Event | None = None
+        self._batch_ready: asyncio.Event | None = None
         self._should_run = False
         self._connected = False
         self._thread: threading.Thread | None = None
+        self._task: asyncio.Task | None = None
         self._loop: asyncio.AbstractEventLoop | None = None
         self._shutdown_event: asyncio.Event | None = None
+        self._message_task: asyncio.Task | None = None
+        self._msg_queue: asyncio.Queue | None = None
         self._current_reconnect_delay = config.reconnect_delay
 
-        # Build device ID lookup for efficient filtering
-        self._device_ids: dict[str, str] = {}
+        # Build a report handler per device; also used for filtering
+        self._handlers: dict[str, Callable[[dict], None]] = {}
         if config.air_sensor_device_id:
-            self._device_ids[config.air_sensor_device_id] = "air"
+            self._handlers[config.air_sensor_device_id] = self._make_handler(
+                "air", config.air_sensor_device_id, include_humidity=True
+            )
         if config.water_sensor_device_id:
-            self._device_ids[config.water_sensor_device_id] = "water"
+            # Water sensor always reports 0 humidity, so ignore it
+            self._handlers[config.water_sensor_device_id] = self._make_handler(
+                "water", config.water_sensor_device_id, include_humidity=False
+            )
 
         logger.info(
-            f"YoLink client initialized with {len(self._device_ids)} device(s): "
+            f"YoLink client initialized with {len(self._handlers)} device(s): "
             f"air={config.air_sensor_device_id}, water={config.water_sensor_device_id}"
         )
         if echo_callback:
             logger.info("YoLink message echo enabled")
 
+    def _make_handler(
+        self, device_type: str, device_id: str, include_humidity: bool
+    ) -> Callable[[dict], None]:
+        """Build the report handler for one configured device.
+
+        The device type and humidity handling are bound here, so handling a
+        report needs no per-message checks on the device type.
+
+        Args:
+            device_type: "air" or "water"
+            device_id: The device ID the handler is bound to
+            include_humidity: Whether to pass through the reported humidity
+
+        Returns:
+            Function taking the parsed JSON payload
+        """
+        if include_humidity:
+
+            def handler(payload: dict) -> None:
+                data = self._read_report(device_id, payload)
+                if data is not None:
+                    self._emit(
+                        device_type, device_id, data, data.get("humidity"), payload
+                    )
+
+        else:
+
+            def handler(payload: dict) -> None:
+                data = self._read_report(device_id, payload)
+                if data is not None:
+                    self._emit(device_type, device_id, data, None, payload)
+
+        return handler
+
     def _process_message(self, device_id: str, payload: dict) -> None:
         """Process an incoming MQTT message.
 
@@ -170,53 +290,93 @@ class YoLinkClient:
             device_id: The device ID from the topic
             payload: Parsed JSON payload
         """
-        logger.info(
-            f"_process_message called: device_id={device_id}, "
-            f"configured_devices={list(self._device_ids.keys())}"
-        )
-
         # Filter: only process messages from our configured devices
-        if device_id not in self._device_ids:
-            logger.info(
-                f"Ignoring message from untracked device: {device_id} "
-                f"(not in {list(self._device_ids.keys())})"
-            )
+        handler = self._handlers.get(device_id)
+        if handler is None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Ignoring message from untracked device: %s (not in %s)",
+                    device_id,
+                    list(self._handlers),
+                )
             return
 
-        device_type = self._device_ids[device_id]
+        handler(payload)
+
+    def _read_report(self, device_id: str, payload: dict) -> dict | None:
+        """Return the data block of a THSensor.Report with a temperature.
+
+        Args:
+            device_id: The device ID that sent the payload
+            payload: Parsed JSON payload
+
+        Returns:
+            The report's data dict, or None if the message should be ignored
+        """
         event = payload.get("event", "")
-        logger.info(f"Processing {device_type} sensor event: {event}")
 
         # Only process THSensor.Report events
         if event != "THSensor.Report":
-            logger.info(
-                f"Ignoring non-report event: {event} (expected THSensor.Report)"
-            )
-            return
-
-        data = payload.get("data", {})
-        temperature = data.get("temperature")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Ignoring non-report event: %s (expected THSensor.Report)", event
+                )
+            return None
 
-        if temperature is None:
+        data = payload.get("data")
+        if data is None or data.get("temperature") is None:
             logger.warning(f"No temperature in report from {device_id}")
-            return
+            return None
+
+        return data
 
-        # For air sensor, include humidity; for water sensor, ignore it (always 0)
-        humidity = None
-        if device_type == "air":
-            humidity = data.get("humidity")
+    def _emit(
+        self,
+        device_type: str,
+        device_id: str,
+        data: dict,
+        humidity: float | None,
+        payload: dict,
+    ) -> None:
+        """Deliver a parsed sensor reading to the callback.
+
+        Args:
+            device_type: "air" or "water"
+            device_id: The device ID that reported the data
+            data: The report's data dict
+            humidity: Humidity to report, or None
+            payload: The complete raw message data dict
+        """
+        temperature = data["temperature"]
 
         # Extract battery and signal info
         battery = data.get("battery")
-        signal = data.get("loraInfo", {}).get("signal")
+        lora = data.get("loraInfo")
+        signal = lora.get("signal") if lora is not None else None
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "YoLink %s sensor (%s): temp=%s°F, humidity=%s%%, battery=%s, signal=%s",
+                device_type,
+                device_id,
+                temperature,
+                humidity,
+                battery,
+                signal,
+            )
 
-        logger.info(
-            f"YoLink {device_type} sensor ({device_id}): "
-            f"temp={temperature}°F, humidity={humidity}%, battery={battery}, signal={signal}"
-        )
+        # Queue for the batch callback, or call the callback directly
+        if self.sensor_callback_batch is not None:
+            self._batch.append(
+                (device_type, device_id, temperature, humidity, battery, signal, payload)
+            )
+            if self._batch_ready:
+                if len(self._batch) == 1:
+                    self._batch_pending.set()
+                if len(self._batch) >= SENSOR_BATCH_SIZE:
+                    self._batch_ready.set()
+            return
 
-        # Call the callback with parsed data
-        logger.info(f"Calling sensor_callback for {device_type} sensor")
         self.sensor_callback(
             device_type,
             device_id,
@@ -226,167 +386,264 @@ class YoLinkClient:
             signal,
             payload,
         )
-        logger.info(f"sensor_callback completed for {device_type} sensor")
 
-    async def _run_async(self) -> None:
-        """Main async loop for MQTT connection with reconnection handling."""
-        self._shutdown_event = asyncio.Event()
-        logger.info(
-            f"YoLink async loop starting, should_run={self._should_run}, "
-            f"configured devices: air={self.config.air_sensor_device_id}, "
-            f"water={self.config.water_sensor_device_id}"
-        )
-        while self._should_run:
+    def _dispatch(self, device_id: str, payload: dict) -> None:
+        """Process one queued report, logging any error."""
+        try:
+            self._process_message(device_id, payload)
+        except Exception as e:
+            logger.error(f"Error processing YoLink message: {e}", exc_info=True)
+
+    async def _consume(self) -> None:
+        """Process parsed reports queued by the MQTT message loop."""
+        while True:
+            device_id, payload = await self._msg_queue.get()
+            self._dispatch(device_id, payload)
+
+    def _flush_batch(self) -> None:
+        """Hand all queued readings to the batch callback."""
+        if not self._batch:
+            return
+
+        readings = list(self._batch)
+        self._batch.clear()
+        try:
+            self.sensor_callback_batch(readings)
+        except Exception as e:
+            logger.error(f"Error in sensor batch callback: {e}", exc_info=True)
+
+    async def _flush_loop(self) -> None:
+        """Flush queued readings when a batch fills or the interval elapses.
+
+        Sleeps until the first reading of a batch arrives, so an idle
+        connection does not wake every SENSOR_BATCH_INTERVAL.
+        """
+        while True:
+            await self._batch_pending.wait()
             try:
-                logger.info("Creating aiohttp session for YoLink...")
-                async with aiohttp.ClientSession() as session:
-                    # Create auth manager and client
-                    auth_mgr = YoLinkAuthManager(
-                        session,
-                        self.config.uaid,
-                        self.config.secret_key,
-                    )
-                    api_client = YoLinkAPIClient(auth_mgr)
-
-                    # Authenticate
-                    logger.info("Authenticating with YoLink API...")
-                    await auth_mgr.check_and_refresh_token()
-                    logger.info("YoLink authentication successful")
-
-                    # Get home ID (required for MQTT topic subscription)
-                    logger.info("Retrieving YoLink home information...")
-                    home_response = await api_client.execute(
-                        url=Endpoints.US.value.url,
-                        bsdp={"method": "Home.getGeneralInfo"},
-                    )
-                    home_id = home_response.data.get("id")
-                    home_name = home_response.data.get("name", "Unknown")
-                    logger.info(f"YoLink home: {home_name} (ID: {home_id})")
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), timeout=SENSOR_BATCH_INTERVAL
+                )
+            except TimeoutError:
+                pass
+            self._batch_pending.clear()
+            self._batch_ready.clear()
+            self._flush_batch()
 
-                    # Build MQTT topic
-                    # Format: yl-home/{home_id}/+/report
-                    mqtt_topic = f"yl-home/{home_id}/+/report"
+    async def _connect_and_listen(
+        self, auth_mgr: YoLinkAuthManager, api_client: YoLinkAPIClient
+    ) -> bool:
+        """Authenticate, connect to the YoLink MQTT broker and process messages.
 
-                    # Get broker details from endpoints
-                    broker_host = Endpoints.US.value.mqtt_broker_host
-                    broker_port = Endpoints.US.value.mqtt_broker_port
+        Args:
+            auth_mgr: Auth manager bound to the shared aiohttp session
+            api_client: YoLink API client using auth_mgr
 
-                    logger.info(
-                        f"Connecting to YoLink MQTT broker at {broker_host}:{broker_port}"
-                    )
-                    logger.info(f"Subscribing to topic: {mqtt_topic}")
+        Returns:
+            True if shutdown was requested, False if the message loop ended
+        """
+        logger.info("Authenticating with YoLink API...")
+        await auth_mgr.check_and_refresh_token()
+        logger.info("YoLink authentication successful")
+        auth_mgr.start_background_refresh()
+
+        # Get home ID (required for MQTT topic subscription)
+        logger.info("Retrieving YoLink home information...")
+        home_response = await api_client.execute(
+            url=Endpoints.US.value.url,
+            bsdp={"method": "Home.getGeneralInfo"},
+        )
+        home_id = home_response.data.get("id")
+        home_name = home_response.data.get("name", "Unknown")
+        logger.info(f"YoLink home: {home_name} (ID: {home_id})")
+
+        # Build MQTT topics
+        # Format: yl-home/{home_id}/{device_id}/report
+        # Echo forwards every device's messages and needs the wildcard;
+        # otherwise subscribe per device and let the broker do the filtering
+        if self.echo_callback:
+            mqtt_topics = [f"yl-home/{home_id}/+/report"]
+        else:
+            mqtt_topics = [
+                f"yl-home/{home_id}/{device_id}/report"
+                for device_id in self._handlers
+            ]
+        topic_list = ", ".join(mqtt_topics)
+        topic_prefix = f"yl-home/{home_id}/"
+        topic_prefix_len = len(topic_prefix)
+
+        # Get broker details from endpoints
+        broker_host = Endpoints.US.value.mqtt_broker_host
+        broker_port = Endpoints.US.value.mqtt_broker_port
 
-                    # Connect to MQTT broker
-                    logger.info(
-                        f"Attempting MQTT connection: host={broker_host}, "
-                        f"port={broker_port}, username_len={len(auth_mgr.access_token())}"
-                    )
-                    async with aiomqtt.Client(
-                        hostname=broker_host,
-                        port=broker_port,
-                        username=auth_mgr.access_token(),
-                        password="",  # Password not used, only token as username
-                        keepalive=60,
-                    ) as mqtt_client:
-                        self._connected = True
-                        self._current_reconnect_delay = self.config.reconnect_delay
-                        logger.info("Connected to YoLink MQTT broker successfully")
-
-                        logger.info(f"Subscribing to MQTT topic: {mqtt_topic}")
-                        await mqtt_client.subscribe(mqtt_topic)
-                        logger.info(f"Subscribed to YoLink topic: {mqtt_topic}")
-
-                        # Process incoming messages
-                        logger.info(
-                            "Entering YoLink message loop, waiting for events..."
+        logger.info(
+            f"Connecting to YoLink MQTT broker at {broker_host}:{broker_port}"
+        )
+        logger.info(f"Subscribing to topic(s): {topic_list}")
+
+        # Connect to MQTT broker
+        logger.info(
+            f"Attempting MQTT connection: host={broker_host}, "
+            f"port={broker_port}, username_len={len(auth_mgr.access_token())}"
+        )
+        async with aiomqtt.Client(
+            hostname=broker_host,
+            port=broker_port,
+            username=auth_mgr.access_token(),
+            password="",  # Password not used, only token as username
+            keepalive=60,
+        ) as mqtt_client:
+            self._connected = True
+            self._current_reconnect_delay = self.config.reconnect_delay
+            logger.info("Connected to YoLink MQTT broker successfully")
+
+            # All topics go out in a single SUBSCRIBE packet
+            await mqtt_client.subscribe([(topic, 0) for topic in mqtt_topics])
+            logger.info(f"Subscribed to YoLink topic(s): {topic_list}")
+
+            # Process incoming messages
+            logger.info(
+                "Entering YoLink message loop, waiting for events..."
+            )
+
+            async def process_messages():
+                # Bind per-message lookups once; none change while connected
+                echo_callback = self.echo_callback
+                handlers = self._handlers
+                enqueue = self._msg_queue.put_nowait
+                loads = orjson.loads
+
+                async for message in mqtt_client.messages:
+                    topic = str(message.topic)
+
+                    # Per-message logging is hot-path; keep it lazy
+                    debug = logger.isEnabledFor(logging.DEBUG)
+                    if debug:
+                        logger.debug(
+                            "YoLink MQTT message received: "
+                            "topic=%s, payload_len=%d bytes",
+                            topic,
+                            len(message.payload),
+                        )
+                        logger.debug(
+                            "YoLink MQTT raw payload: %s",
+                            message.payload[:500],
                         )
 
-                        # Create message processing as a task so we can cancel it
-                        async def process_messages():
-                            async for message in mqtt_client.messages:
-                                # Log EVERY message received
-                                logger.info(
-                                    f"YoLink MQTT message received: "
-                                    f"topic={message.topic}, "
-                                    f"payload_len={len(message.payload)} bytes"
-                                )
+                    # Echo ALL messages if callback is configured
+                    # This happens BEFORE any filtering
+                    if echo_callback:
+                        try:
+                            echo_callback(topic, message.payload)
+                        except Exception as e:
+                            logger.error(
+                                f"Error in echo callback: {e}", exc_info=True
+                            )
+
+                    if not self._should_run:
+                        logger.info(
+                            "YoLink client stopping, exiting message loop"
+                        )
+                        break
+
+                    try:
+                        # Parse topic to extract device ID
+                        # Format: yl-home/{home_id}/{device_id}/report
+                        # Only the device segment is needed, so slice off
+                        # the known prefix rather than splitting it all
+                        device_id = "unknown"
+                        if topic.startswith(topic_prefix):
+                            rest = topic[topic_prefix_len:]
+                            segment, sep, _ = rest.partition("/")
+                            if sep:
+                                device_id = segment
+
+                        # Skip untracked devices before paying for the JSON parse
+                        if device_id not in handlers:
+                            if debug:
                                 logger.debug(
-                                    f"YoLink MQTT raw payload: {message.payload[:500]}"
+                                    "Ignoring message from untracked device: %s",
+                                    device_id,
                                 )
-
-                                # Echo ALL messages if callback is configured
-                                # This happens BEFORE any filtering
-                                if self.echo_callback:
-                                    try:
-                                        self.echo_callback(
-                                            str(message.topic), message.payload
-                                        )
-                                    except Exception as e:
-                                        logger.error(
-                                            f"Error in echo callback: {e}", exc_info=True
-                                        )
-
-                                if not self._should_run:
-                                    logger.info(
-                                        "YoLink client stopping, exiting message loop"
-                                    )
-                                    break
-
-                                try:
-                                    # Parse topic to extract device ID
-                                    # Format: yl-home/{home_id}/{device_id}/report
-                                    topic_parts = str(message.topic).split("/")
-                                    logger.debug(f"YoLink topic parts: {topic_parts}")
-                                    device_id = (
-                                        topic_parts[2] if len(topic_parts) >= 4 else "unknown"
-                                    )
-                                    logger.info(f"YoLink message from device_id={device_id}")
-
-                                    # Parse payload
-                                    payload = json.loads(message.payload.decode("utf-8"))
-                                    event_type = payload.get("event", "unknown")
-                                    payload_device_id = payload.get("deviceId", "unknown")
-                                    logger.info(
-                                        f"YoLink event: type={event_type}, "
-                                        f"payload_device_id={payload_device_id}"
-                                    )
-
-                                    # Process the message
-                                    self._process_message(device_id, payload)
-
-                                except json.JSONDecodeError as e:
-                                    logger.error(
-                                        f"Failed to parse YoLink message: {e}, "
-                                        f"raw={message.payload[:200]}"
-                                    )
-                                except Exception as e:
-                                    logger.error(
-                                        f"Error processing YoLink message: {e}",
-                                        exc_info=True,
-                                    )
-
-                        # Run message processing with shutdown monitoring
-                        message_task = asyncio.create_task(process_messages())
-                        shutdown_task = asyncio.create_task(self._shutdown_event.wait())
-
-                        done, pending = await asyncio.wait(
-                            [message_task, shutdown_task],
-                            return_when=asyncio.FIRST_COMPLETED
+                            continue
+
+                        # Parse payload
+                        # orjson parses the raw bytes without decoding first
+                        payload = loads(message.payload)
+                        if debug:
+                            logger.debug(
+                                "YoLink event from device_id=%s: type=%s, "
+                                "payload_device_id=%s",
+                                device_id,
+                                payload.get("event", "unknown"),
+                                payload.get("deviceId", "unknown"),
+                            )
+
+                        # Hand off so slow callbacks don't stall the MQTT reader
+                        try:
+                            enqueue((device_id, payload))
+                        except asyncio.QueueFull:
+                            logger.warning(
+                                f"YoLink message queue full, dropping report "
+                                f"from {device_id}"
+                            )
+
+                    except orjson.JSONDecodeError as e:
+                        logger.error(
+                            f"Failed to parse YoLink message: {e}, "
+                            f"raw={message.payload[:200]}"
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"Error processing YoLink message: {e}",
+                            exc_info=True,
                         )
 
-                        # Cancel pending tasks
-                        for task in pending:
-                            task.cancel()
-                            try:
-                                await task
-                            except asyncio.CancelledError:
-                                pass
+            # Run message processing; _signal_shutdown() cancels it directly
+            message_task = asyncio.create_task(process_messages())
+            self._message_task = message_task
+            if self._shutdown_event.is_set():
+                message_task.cancel()
+
+            try:
+                await message_task
+            except asyncio.CancelledError:
+                # Propagate if we are being cancelled rather than the message loop
+                if asyncio.current_task().cancelling():
+                    raise
+            finally:
+                self._message_task = None
+
+            # Check if shutdown was requested
+            if self._shutdown_event.is_set():
+                logger.info("Shutdown requested, exiting YoLink message loop")
+                return True
+
+        return False
+
+    def _signal_shutdown(self) -> None:
+        """Wake the reconnect loop and cancel message processing.
 
-                        # Check if shutdown was requested
-                        if shutdown_task in done:
-                            logger.info("Shutdown requested, exiting YoLink message loop")
-                            break
+        Must be called on the client's event loop.
+        """
+        if self._shutdown_event:
+            self._shutdown_event.set()
+        if self._message_task:
+            self._message_task.cancel()
+
+    async def _reconnect_loop(
+        self, auth_mgr: YoLinkAuthManager, api_client: YoLinkAPIClient
+    ) -> None:
+        """Keep the MQTT connection up, backing off between attempts.
 
+        Args:
+            auth_mgr: Auth manager bound to the shared aiohttp session
+            api_client: YoLink API client using auth_mgr
+        """
+        while self._should_run:
+            try:
+                if await self._connect_and_listen(auth_mgr, api_client):
+                    break
             except aiomqtt.MqttError as e:
                 self._connected = False
                 logger.error(f"YoLink MQTT error: {e}")
@@ -410,7 +667,7 @@ class YoLinkClient:
                     )
                     # If we get here, shutdown was requested
                     break
-                except asyncio.TimeoutError:
+                except TimeoutError:
                     # Normal timeout, continue reconnect loop
                     pass
 
@@ -420,53 +677,120 @@ class YoLinkClient:
                     self.config.max_reconnect_delay,
                 )
 
+    async def _run_async(self) -> None:
+        """Main async loop for MQTT connection with reconnection handling."""
+        self._shutdown_event = asyncio.Event()
+        logger.info(
+            f"YoLink async loop starting, should_run={self._should_run}, "
+            f"configured devices: air={self.config.air_sensor_device_id}, "
+            f"water={self.config.water_sensor_device_id}"
+        )
+
+        # One session for the whole run so reconnects reuse pooled TCP/TLS
+        # connections to the YoLink API instead of handshaking again
+        logger.info("Creating aiohttp session for YoLink...")
+        connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=75)
+        timeout = aiohttp.ClientTimeout(total=30, connect=10)
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+            auth_mgr = YoLinkAuthManager(
+                session,
+                self.config.uaid,
+                self.config.secret_key,
+            )
+            api_client = YoLinkAPIClient(auth_mgr)
+
+            self._msg_queue = asyncio.Queue(maxsize=MESSAGE_QUEUE_SIZE)
+            if self.sensor_callback_batch is not None:
+                self._batch_pending = asyncio.Event()
+                self._batch_ready = asyncio.Event()
+
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    consume_task = tg.create_task(self._consume())
+                    flush_task = None
+                    if self.sensor_callback_batch is not None:
+                        flush_task = tg.create_task(self._flush_loop())
+
+                    try:
+                        await self._reconnect_loop(auth_mgr, api_client)
+                    finally:
+                        # Workers loop forever; cancel them so the group can exit
+                        consume_task.cancel()
+                        if flush_task is not None:
+                            flush_task.cancel()
+            finally:
+                # The group has awaited its tasks; handle what they had not reached
+                while not self._msg_queue.empty():
+                    self._dispatch(*self._msg_queue.get_nowait())
+                self._flush_batch()
+                await auth_mgr.stop_background_refresh()
+
         self._connected = False
         logger.info("YoLink async loop ended")
 
-    def _run_loop(self) -> None:
-        """Run the async event loop in a thread."""
-        self._loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self._loop)
+    async def run(self) -> None:
+        """Run the client on the current event loop until stopped."""
+        self._loop = asyncio.get_running_loop()
         try:
-            self._loop.run_until_complete(self._run_async())
-        except RuntimeError as e:
-            # Handle "Event loop stopped before Future completed" during shutdown
-            if "Event loop stopped" in str(e):
-                logger.debug("Event loop stopped during shutdown (expected)")
-            else:
-                raise
+            await self._run_async()
         finally:
-            # Cancel any remaining tasks
-            try:
-                pending = asyncio.all_tasks(self._loop)
-                for task in pending:
-                    task.cancel()
-                # Give tasks a chance to handle cancellation
-                if pending:
-                    self._loop.run_until_complete(
-                        asyncio.gather(*pending, return_exceptions=True)
-                    )
-            except RuntimeError:
-                pass  # Loop may already be closed
-            finally:
-                try:
-                    self._loop.close()
-                except RuntimeError:
-                    pass
-                self._loop = None
+            self._loop = None
 
-    def start(self) -> None:
-        """Start the YoLink client in a background thread."""
+    def _can_start(self) -> bool:
+        """Check whether the client is enabled and configured."""
         if not self.config.enabled:
             logger.info("YoLink integration is disabled")
-            return
+            return False
 
         if not self.config.uaid or not self.config.secret_key:
             logger.warning("YoLink credentials not configured, skipping")
-            return
+            return False
 
-        if not self._device_ids:
+        if not self._handlers:
             logger.warning("No YoLink device IDs configured, skipping")
+            return False
+
+        return True
+
+    def start_async(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the YoLink client as a task on an existing event loop.
+
+        Use this instead of start() when the host application already runs
+        asyncio, so no second event loop or thread is needed.
+
+        Args:
+            loop: Event loop to run the client on
+        """
+        if not self._can_start():
+            return
+
+        self._should_run = True
+        self._task = loop.create_task(self.run())
+        logger.info("YoLink client started")
+
+    async def stop_async(self) -> None:
+        """Stop a client started with start_async() and wait for it to finish."""
+        logger.info("Stopping YoLink client...")
+        self._should_run = False
+        self._signal_shutdown()
+
+        if self._task:
+            await self._task
+            self._task = None
+
+        self._connected = False
+        self._shutdown_event = None
+        logger.info("YoLink client stopped")
+
+    def _run_loop(self) -> None:
+        """Run the client on a private event loop in a thread."""
+        asyncio.run(self.run())
+
+    def start(self) -> None:
+        """Start the YoLink client in a background thread."""
+        if not self._can_start():
             return
 
         self._should_run = True
@@ -484,9 +808,9 @@ class YoLinkClient:
         self._should_run = False
 
         # Signal the async loop to shutdown gracefully
-        if self._loop and self._shutdown_event:
+        if self._loop:
             try:
-                self._loop.call_soon_threadsafe(self._shutdown_event.set)
+                self._loop.call_soon_threadsafe(self._signal_shutdown)
             except RuntimeError:
                 pass  # Loop may already be closed
 
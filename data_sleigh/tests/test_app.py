@@ -0,0 +1,84 @@
+"""Tests for the Data Sleigh application message path."""
+
+import threading
+
+import pytest
+
+from data_sleigh.app import DataSleighApp
+
+CONFIG_CONTENT = """
+[mqtt]
+broker = "localhost"
+
+[database]
+path = "{db_path}"
+batch_size = 10
+
+[[topics]]
+pattern = "xmas/tree/water/raw"
+table_name = "water_level"
+
+[season]
+start = "2024-12-01"
+end = "2025-01-15"
+
+[s3]
+bucket = "test-bucket"
+"""
+
+
+@pytest.fixture
+def app(test_config_path, test_db_path):
+    """Create an app with a real store but no network clients."""
+    test_config_path.write_text(CONFIG_CONTENT.format(db_path=test_db_path))
+    app = DataSleighApp(test_config_path)
+    app._initialize_storage()
+    yield app
+    app.store.close()
+
+
+def test_handle_message_is_stored_by_writer_thread(app):
+    """Test that queued messages are written once the writer drains."""
+    app._writer_thread = threading.Thread(target=app._writer_loop, daemon=True)
+    app._writer_thread.start()
+
+    for i in range(25):
+        app._handle_message("xmas/tree/water/raw", f"{i}.0".encode(), 1, False)
+    app._handle_message("unknown/topic", b"ignored", 0, False)
+
+    # Stopping the writer stores everything that was queued before it
+    app._message_queue.put(None)
+    app._writer_thread.join(timeout=5)
+    assert not app._writer_thread.is_alive()
+
+    app.store.flush()
+    assert app.store.get_stats("water_level")["count"] == 25
+
+
+def test_full_queue_drops_oldest_message(app):
+    """Test that a full queue keeps the most recent messages."""
+    maxsize = app._message_queue.maxsize
+    for i in range(maxsize + 5):
+        app._handle_message("xmas/tree/water/raw", f"{i}.0".encode(), 1, False)
+
+    queued = []
+    while not app._message_queue.empty():
+        queued.append(app._message_queue.get_nowait())
+
+    assert len(queued) == maxsize
+    assert queued[0][3] == b"5.0"
+    assert queued[-1][3] == f"{maxsize + 4}.0".encode()
+
+
+def test_cleanup_joins_background_threads(app):
+    """Test that cleanup stops the flush and writer threads before closing."""
+    app._writer_thread = threading.Thread(target=app._writer_loop, daemon=True)
+    app._flush_thread = threading.Thread(target=app._flush_loop, daemon=True)
+    app._writer_thread.start()
+    app._flush_thread.start()
+
+    app._handle_message("xmas/tree/water/raw", b"1.0", 1, False)
+    app._cleanup()
+
+    assert not app._flush_thread.is_alive()
+    assert not app._writer_thread.is_alive()
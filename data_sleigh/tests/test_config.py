@@ -58,6 +58,7 @@ hour = 3
     assert config.database.path == "/app/data/test.db"
     assert len(config.topics) == 1
     assert config.topics[0].pattern == "test/#"
+    assert config.topics[0].pattern_parts == ("test", "#")
     assert config.season.start == date(2024, 12, 1)
     assert config.season.end == date(2025, 1, 15)
     assert config.s3.bucket == "test-bucket"
@@ -79,10 +80,61 @@ broker = "localhost"
         load_config(test_config_path)
 
 
+def test_config_reports_all_missing_keys(test_config_path):
+    """Test that validation lists every problem in one error."""
+    test_config_path.write_text("""
+[mqtt]
+port = 1883
+
+[[topics]]
+table_name = "test_table"
+
+[season]
+start = "2024-12-01"
+""")
+
+    with pytest.raises(ValueError) as exc_info:
+        load_config(test_config_path)
+
+    message = str(exc_info.value)
+    assert "Missing required section: database, s3" in message
+    assert "topic.pattern is required" in message
+    assert "mqtt.broker is required" in message
+    assert "season.end is required" in message
+
+
 def test_config_file_not_found():
     """Test that missing config file raises FileNotFoundError."""
     with pytest.raises(FileNotFoundError):
         load_config("nonexistent.toml")
 
 
+def test_load_config_is_cached_until_env_changes(test_config_path, monkeypatch):
+    """Test that repeated loads reuse the parsed config until inputs change."""
+    test_config_path.write_text("""
+[mqtt]
+broker = "localhost"
+
+[database]
+path = "/app/data/test.db"
+
+[[topics]]
+pattern = "test/#"
+table_name = "test_table"
+
+[season]
+start = "2024-12-01"
+end = "2025-01-15"
+
+[s3]
+bucket = "test-bucket"
+""")
+    monkeypatch.delenv("MQTT_BROKER", raising=False)
+
+    config = load_config(test_config_path)
+    assert load_config(test_config_path) is config
 
+    monkeypatch.setenv("MQTT_BROKER", "broker.example.com")
+    reloaded = load_config(test_config_path)
+    assert reloaded is not config
+    assert reloaded.mqtt.broker == "broker.example.com"
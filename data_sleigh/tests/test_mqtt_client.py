@@ -0,0 +1,106 @@
+"""Tests for the MQTT client wrapper."""
+
+import asyncio
+import threading
+
+import paho.mqtt.client as mqtt
+
+from data_sleigh import mqtt_client
+from data_sleigh.config import MQTTConfig
+from data_sleigh.mqtt_client import MQTTLogger
+
+
+def test_loop_asyncio_retries_initial_connect(monkeypatch):
+    """Test that a broker down at startup is retried, and hooks are detached."""
+    monkeypatch.setattr(mqtt_client, "MIN_RECONNECT_DELAY", 0)
+    client = MQTTLogger(MQTTConfig(broker="localhost"), lambda *args: None)
+
+    attempts = []
+
+    def refuse(*args, **kwargs):
+        attempts.append(args)
+        if len(attempts) == 3:
+            client.disconnect()
+        raise ConnectionRefusedError("broker down")
+
+    monkeypatch.setattr(client._client, "connect", refuse)
+
+    asyncio.run(asyncio.wait_for(client.loop_asyncio(), timeout=5))
+
+    assert len(attempts) == 3
+    assert client._client.on_socket_open is None
+    assert client._client.on_socket_register_write is None
+    assert client._loop is None
+
+
+def test_dispatch_workers_keep_order_and_drain_on_disconnect():
+    """Test per-topic ordering and that queued messages survive disconnect."""
+    received: dict[str, list[bytes]] = {}
+
+    def callback(topic, payload, qos, retain):
+        received.setdefault(topic, []).append(payload)
+
+    client = MQTTLogger(MQTTConfig(broker="localhost"), callback, dispatch_workers=3)
+
+    topics = [f"sensors/{i}" for i in range(5)]
+    for n in range(200):
+        for topic in topics:
+            message = mqtt.MQTTMessage(topic=topic.encode())
+            message.payload = str(n).encode()
+            client._on_message(client._client, None, message)
+
+    client.disconnect()
+
+    assert not client._dispatch_threads
+    expected = [str(n).encode() for n in range(200)]
+    assert received == dict.fromkeys(topics, expected)
+
+
+def test_subscribe_under_loop_asyncio_writes_from_loop_thread():
+    """Test that a debounced subscribe arms the writer on the loop thread."""
+
+    async def run():
+        subscribed = asyncio.Event()
+
+        async def broker(reader, writer):
+            await reader.read(1024)  # CONNECT
+            writer.write(b"\x20\x02\x00\x00")  # CONNACK, accepted
+            await writer.drain()
+            while packet := await reader.read(1024):
+                if packet[0] & 0xF0 == 0x80:  # SUBSCRIBE
+                    subscribed.set()
+            writer.close()
+
+        server = await asyncio.start_server(broker, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        loop = asyncio.get_running_loop()
+        writer_threads = []
+        add_writer = loop.add_writer
+
+        def record_add_writer(*args):
+            writer_threads.append(threading.current_thread())
+            return add_writer(*args)
+
+        loop.add_writer = record_add_writer
+
+        client = MQTTLogger(
+            MQTTConfig(broker="127.0.0.1", port=port), lambda *args: None
+        )
+        task = asyncio.create_task(client.loop_asyncio())
+        while not client._connected:
+            await asyncio.sleep(0.01)
+
+        writer_threads.clear()
+        await asyncio.to_thread(client.subscribe, "sensors/#")
+        await asyncio.wait_for(subscribed.wait(), timeout=5)
+
+        client.disconnect()
+        await asyncio.wait_for(task, timeout=5)
+        server.close()
+        return writer_threads
+
+    writer_threads = asyncio.run(run())
+
+    assert writer_threads
+    assert all(thread is threading.main_thread() for thread in writer_threads)
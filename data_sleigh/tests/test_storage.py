@@ -1,5 +1,9 @@
 """Tests for DuckDB storage."""
 
+import threading
+import time
+from datetime import datetime, timedelta
+
 import pytest
 
 from data_sleigh.storage import MessageStore
@@ -148,4 +152,81 @@ def test_storage_batching(test_db_path):
     store.close()
 
 
+def test_insert_batch(test_db_path):
+    """Test inserting several received messages in one call."""
+    store = MessageStore(test_db_path, batch_size=3)
+    store.create_table("test_messages")
+
+    received = datetime(2024, 12, 1, 12, 0, 0)
+    store.insert_batch(
+        "test_messages",
+        [
+            (received + timedelta(seconds=i), f"test/{i}", f"{i}".encode(), 1, False)
+            for i in range(4)
+        ],
+    )
+
+    # A batch past batch_size flushes once, keeping each receipt time
+    messages = store.query("test_messages", limit=10)
+    assert len(messages) == 4
+    assert messages[0]["timestamp"] == received + timedelta(seconds=3)
+    assert messages[-1]["payload"] == "0"
+
+    store.close()
+
+
+def test_checkpoint_every(test_db_path):
+    """Test that the WAL is checkpointed only after enough flushed messages."""
+    store = MessageStore(test_db_path, batch_size=2, checkpoint_every=4)
+    store.create_table("test_messages")
+
+    wal_path = test_db_path.with_name(test_db_path.name + ".wal")
+
+    for i in range(2):
+        store.insert_message("test_messages", "test/topic", f"{i}".encode())
+    assert wal_path.exists()
+
+    for i in range(2, 4):
+        store.insert_message("test_messages", "test/topic", f"{i}".encode())
+    assert not wal_path.exists()
+
+    store.close()
 
+
+def test_query_as_frame(test_db_path):
+    """Test fetching query results as a DataFrame."""
+    store = MessageStore(test_db_path, batch_size=1)
+    store.create_table("test_messages")
+
+    for i in range(3):
+        store.insert_message("test_messages", f"test/{i}", f"{i}".encode())
+
+    frame = store.query("test_messages", topic_filter="test/%", as_frame=True)
+    assert list(frame["payload"]) == ["2", "1", "0"]
+    assert list(frame.columns) == list(store.query("test_messages")[0])
+
+    store.close()
+
+
+def test_flush_keeps_concurrent_inserts(test_db_path):
+    """Test that rows inserted while another thread flushes are not lost."""
+    store = MessageStore(test_db_path, batch_size=1_000_000)
+    store.create_table("test_messages")
+
+    def insert(worker):
+        for i in range(2000):
+            store.insert_message("test_messages", f"test/{worker}", f"{i}".encode())
+            time.sleep(0)
+
+    threads = [threading.Thread(target=insert, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        store.flush("test_messages")
+    for thread in threads:
+        thread.join()
+    store.flush("test_messages")
+
+    assert store.get_stats("test_messages")["count"] == 8000
+
+    store.close()
@@ -0,0 +1,161 @@
+"""Tests for MQTT topic pattern matching."""
+
+import pytest
+
+from data_sleigh.app import DataSleighApp
+from data_sleigh.topics import TopicTrie
+
+
+@pytest.mark.parametrize(
+    "topic,pattern,expected",
+    [
+        ("sensors/temp", "sensors/temp", True),
+        ("sensors/temp", "sensors/+", True),
+        ("devices/1/status", "devices/+/status", True),
+        ("sensors/temp/room1", "sensors/#", True),
+        ("sensors/temp/room1/sensor1", "sensors/#", True),
+        ("devices/temp", "sensors/+", False),
+        ("sensors/temp/room1", "sensors/+", False),
+        ("sensors", "sensors/#", True),
+        ("anything/at/all", "#", True),
+        ("a/x/b", "a/#/b", False),
+        ("a.b", "a+b", False),
+    ],
+)
+def test_trie_single_pattern(topic, pattern, expected):
+    """Test matching a topic against one pattern."""
+    trie = TopicTrie()
+    trie.add(pattern, "table")
+
+    assert (trie.match(topic) == "table") is expected
+
+
+def test_trie_exact_and_wildcards():
+    """Test literal, single-level and multi-level patterns."""
+    trie = TopicTrie()
+    trie.add("xmas/tree/water/raw", "water_level")
+    trie.add("sensors/+/temp", "temps")
+    trie.add("logs/#", "logs")
+
+    assert trie.match("xmas/tree/water/raw") == "water_level"
+    assert trie.match("sensors/kitchen/temp") == "temps"
+    assert trie.match("logs/app/error") == "logs"
+    assert trie.match("logs") == "logs"
+    assert trie.match("sensors/kitchen/humidity") is None
+    assert trie.match("xmas/tree/water") is None
+
+
+def test_trie_first_pattern_wins():
+    """Test that overlapping patterns resolve in insertion order."""
+    trie = TopicTrie()
+    trie.add("sensors/#", "all_sensors")
+    trie.add("sensors/+/temp", "temps")
+
+    assert trie.match("sensors/kitchen/temp") == "all_sensors"
+
+    trie = TopicTrie()
+    trie.add("sensors/+/temp", "temps")
+    trie.add("sensors/#", "all_sensors")
+
+    assert trie.match("sensors/kitchen/temp") == "temps"
+    assert trie.match("sensors/kitchen/humidity") == "all_sensors"
+
+
+def test_trie_ignores_misplaced_multi_level_wildcard():
+    """Test that # anywhere but the last level never matches."""
+    trie = TopicTrie()
+    trie.add("a/#/b", "bad")
+
+    assert trie.match("a/x/b") is None
+
+
+def test_trie_deep_topics_against_shallow_patterns():
+    """Test topics with more levels than any pattern."""
+    trie = TopicTrie()
+    trie.add("a/+", "single")
+    trie.add("b/#", "multi")
+
+    assert trie.match("a/x/y/z") is None
+    assert trie.match("b/x/y/z") == "multi"
+
+
+@pytest.mark.parametrize(
+    "topic,expected",
+    [
+        ("a", "t1"),
+        ("a/b", "t1"),
+        ("a/b/c", "t0"),
+        ("b/b", "t2"),
+        ("a//c", "t0"),
+        ("", None),
+        ("x/y/z/w", "t4"),
+    ],
+)
+def test_trie_overlapping_patterns(topic, expected):
+    """Test that the first of several matching patterns wins."""
+    patterns = ["a/+/c", "a/#", "+/b", "#/x", "+/+/+/+", "a/b"]
+    trie = TopicTrie()
+    for i, pattern in enumerate(patterns):
+        trie.add(pattern, f"t{i}")
+
+    assert trie.match(topic) == expected
+
+
+def test_topic_cache_is_bounded(monkeypatch):
+    """Test that the topic -> table cache evicts least recently used topics."""
+    from collections import OrderedDict
+
+    import data_sleigh.app as app_module
+
+    monkeypatch.setattr(app_module, "TOPIC_CACHE_SIZE", 2)
+
+    app = DataSleighApp.__new__(DataSleighApp)
+    app._topic_table_map = OrderedDict()
+    app._exact_topics = {}
+    app._topic_trie = TopicTrie()
+    app._topic_trie.add("sensors/#", "sensors")
+
+    app._find_table_for_topic("sensors/a")
+    app._find_table_for_topic("sensors/b")
+    app._find_table_for_topic("sensors/a")  # refresh a
+    app._find_table_for_topic("sensors/c")  # evicts b
+
+    assert list(app._topic_table_map) == ["sensors/a", "sensors/c"]
+
+
+def test_exact_topics_respect_pattern_order(test_config_path):
+    """Test that literal patterns don't jump ahead of earlier wildcards."""
+    test_config_path.write_text("""
+[mqtt]
+broker = "localhost"
+
+[database]
+path = "/tmp/test.db"
+
+[[topics]]
+pattern = "xmas/tree/water/raw"
+table_name = "water_level"
+
+[[topics]]
+pattern = "sensors/#"
+table_name = "sensors"
+
+[[topics]]
+pattern = "sensors/kitchen/temp"
+table_name = "kitchen"
+
+[season]
+start = "2024-12-01"
+end = "2025-01-15"
+
+[s3]
+bucket = "test-bucket"
+""")
+    app = DataSleighApp(test_config_path)
+
+    assert app._exact_topics == {
+        "xmas/tree/water/raw": "water_level",
+        "sensors/kitchen/temp": "sensors",
+    }
+    assert app._find_table_for_topic("xmas/tree/water/raw") == "water_level"
+    assert app._find_table_for_topic("sensors/kitchen/temp") == "sensors"
@@ -0,0 +1,85 @@
+"""Tests for S3 upload functionality."""
+
+import gzip
+import json
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from data_sleigh import uploader
+from data_sleigh.analyzer import analyze_water_level_segments
+from data_sleigh.storage import MessageStore
+from data_sleigh.uploader import create_json_output, upload_to_s3, upload_to_s3_async
+
+
+def test_upload_serializes_analysis_output(test_db_path, monkeypatch):
+    """Test that a real analysis result (with numpy scalars) uploads."""
+    store = MessageStore(test_db_path, batch_size=1000)
+    store.create_table("water_level")
+
+    # A refill (distance drops) followed by steady consumption (distance rises)
+    start = datetime(2024, 12, 10)
+    for i in range(300):
+        level = 40 - i * 25 / 60 if i < 60 else 15 + (i - 60) / 30
+        store.insert_message(
+            "water_level",
+            "xmas/tree/water/raw",
+            f"{level:.2f}".encode(),
+            timestamp=start + timedelta(minutes=i),
+        )
+    store.flush()
+
+    analysis = analyze_water_level_segments(store.get_connection())
+    store.close()
+    assert analysis["current_prediction"]
+
+    data = create_json_output(
+        measurements=[],
+        season_start="2024-12-01",
+        season_end="2025-01-15",
+        is_in_season=True,
+        analysis=analysis,
+    )
+
+    s3_client = MagicMock()
+    monkeypatch.setattr(uploader.boto3, "client", lambda *args, **kwargs: s3_client)
+
+    upload_to_s3(data, "test-bucket", "data.json", "key", "secret", verbose=False)
+
+    body = s3_client.put_object.call_args.kwargs["Body"]
+    uploaded = json.loads(gzip.decompress(body))
+    assert uploaded["analysis"]["current_prediction"] == json.loads(
+        json.dumps(analysis["current_prediction"])
+    )
+
+
+def test_async_uploads_to_same_key_never_overlap(monkeypatch):
+    """Test that background uploads run one at a time and the newest wins."""
+    first_started = threading.Event()
+    release_first = threading.Event()
+    running = []
+    overlapped = []
+    uploaded = []
+
+    def fake_upload(**kwargs):
+        if running:
+            overlapped.append(kwargs["data"])
+        running.append(kwargs["data"])
+        if kwargs["data"]["n"] == 0:
+            first_started.set()
+            release_first.wait(timeout=5)
+        uploaded.append(kwargs["data"]["n"])
+        running.pop()
+
+    monkeypatch.setattr(uploader, "upload_to_s3", fake_upload)
+
+    args = ("bucket", "snapshot.json", "key", "secret")
+    futures = [upload_to_s3_async({"n": 0}, *args)]
+    assert first_started.wait(timeout=5)
+    futures += [upload_to_s3_async({"n": n}, *args) for n in range(1, 4)]
+    release_first.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert not overlapped
+    assert uploaded == [0, 3]
@@ -13,9 +13,11 @@ Examples:
 """
 import argparse
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-from random import gauss, randint, uniform
+
+import numpy as np
+import pandas as pd
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -23,6 +25,49 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from data_sleigh.storage import MessageStore
 
 
+def bulk_insert(
+    store: MessageStore,
+    table_name: str,
+    frame: pd.DataFrame,
+    derived: dict[str, str] | None = None,
+) -> None:
+    """Insert a whole column batch into a table with a single statement.
+
+    Args:
+        store: MessageStore instance
+        table_name: Target table name
+        frame: Columns to insert, named after the table columns
+        derived: Extra table columns mapped to SQL expressions over the frame
+    """
+    conn = store.get_connection()
+    derived = derived or {}
+    columns = ", ".join([*frame.columns, *derived])
+    select = ", ".join([*frame.columns, *derived.values()])
+    conn.register("sample_batch", frame)
+    try:
+        conn.execute(
+            f"INSERT INTO {table_name} ({columns}) SELECT {select} FROM sample_batch"
+        )
+        conn.commit()
+    finally:
+        conn.unregister("sample_batch")
+
+
+def minute_timestamps(now: datetime, count: int, step_minutes: int) -> pd.DatetimeIndex:
+    """Build evenly spaced timestamps ending one step before now.
+
+    Args:
+        now: Reference time
+        count: Number of timestamps
+        step_minutes: Spacing between timestamps in minutes
+
+    Returns:
+        Ascending timestamps, oldest first
+    """
+    offsets = np.arange(count, 0, -1) * step_minutes
+    return pd.Timestamp(now) - pd.to_timedelta(offsets, unit="min")
+
+
 def generate_water_level_data(store: MessageStore, days: int = 1):
     """Generate sample water level data.
 
@@ -40,44 +85,46 @@ def generate_water_level_data(store: MessageStore, days: int = 1):
 
     # Generate data points every minute
     total_points = days * 24 * 60
+    timestamps = minute_timestamps(now, total_points, 1)
 
-    for i in range(total_points):
-        timestamp = now - timedelta(minutes=total_points - i)
-
-        # Consumption rate: slowly increase (tree drinks water)
-        # Average: 0.01mm per minute, ~14.4mm per day
-        consumption = gauss(0.01, 0.002)
-        current_level += consumption
+    # Draw all random values up front; only the running level is sequential
+    rng = np.random.default_rng()
+    # Consumption rate: slowly increase (tree drinks water)
+    # Average: 0.01mm per minute, ~14.4mm per day
+    consumptions = rng.normal(0.01, 0.002, total_points)
+    noises = rng.normal(0, 0.5, total_points)
+    refill_levels = rng.uniform(8, 12, total_points)
 
-        # Add some noise
-        noisy_level = current_level + gauss(0, 0.5)
+    levels = np.empty(total_points)
 
-        # Clamp to reasonable bounds
-        noisy_level = max(5.0, min(50.0, noisy_level))
+    for i in range(total_points):
+        current_level += consumptions[i]
 
         # Simulate refills (when level gets high, reset to low)
         if current_level > 45:
-            current_level = uniform(8, 12)
-            noisy_level = current_level
-
-        # Store as bytes (simulating MQTT payload)
-        payload = str(round(noisy_level, 2)).encode("utf-8")
-
-        store.insert_message(
-            table_name=table_name,
-            topic="xmas/tree/water/raw",
-            payload=payload,
-            qos=1,
-            retain=False,
-        )
-
-        # Flush periodically
-        if i % 1000 == 0:
-            store.flush(table_name)
-            print(f"  Generated {i}/{total_points} water level points...")
-
-    # Final flush
-    store.flush(table_name)
+            current_level = refill_levels[i]
+            levels[i] = current_level
+        else:
+            # Add some noise
+            levels[i] = current_level + noises[i]
+
+    # Clamp to reasonable bounds and format all payloads in one pass
+    # (stored as the decoded text of the MQTT payload)
+    payloads = np.round(np.clip(levels, 5.0, 50.0), 2).astype(str)
+
+    bulk_insert(
+        store,
+        table_name,
+        pd.DataFrame(
+            {
+                "timestamp": timestamps,
+                "topic": "xmas/tree/water/raw",
+                "payload": payloads,
+                "qos": 1,
+                "retain": False,
+            }
+        ),
+    )
     print(f"  ✓ Generated {total_points} water level data points")
 
 
@@ -93,6 +140,7 @@ def generate_yolink_data(store: MessageStore, days: int = 1):
     print(f"Generating {days} days of YoLink sensor data...")
 
     now = datetime.now()
+    rng = np.random.default_rng()
 
     # Generate data points every 5 minutes for air sensor
     air_points = days * 24 * 12  # 12 per hour
@@ -100,92 +148,65 @@ def generate_yolink_data(store: MessageStore, days: int = 1):
     base_temp_air = 72.0
     base_humidity = 45.0
 
-    for i in range(air_points):
-        timestamp = now - timedelta(minutes=5 * (air_points - i))
-
-        # Simulate daily temperature variation
-        hour_of_day = timestamp.hour + timestamp.minute / 60
-        temp_variation = 3 * ((hour_of_day - 12) / 12)  # +/- 3 degrees through day
-        temperature = base_temp_air + temp_variation + gauss(0, 0.5)
-
-        # Humidity varies inversely with temperature
-        humidity_variation = -2 * temp_variation
-        humidity = base_humidity + humidity_variation + gauss(0, 2)
-        humidity = max(20, min(80, humidity))
-
-        battery = randint(95, 100)
-        signal = randint(-55, -45)
-
-        raw_data = {
-            "event": "THSensor.Report",
-            "deviceId": air_device_id,
-            "data": {
-                "temperature": temperature,
-                "humidity": humidity,
-                "battery": battery,
-                "loraInfo": {"signal": signal},
-            },
-            "time": timestamp.isoformat(),
-        }
+    air_timestamps = minute_timestamps(now, air_points, 5)
 
-        store.insert_yolink_message(
-            device_type="air",
-            device_id=air_device_id,
-            temperature=temperature,
-            humidity=humidity,
-            battery=battery,
-            signal=signal,
-            raw_data=raw_data,
-            table_name=table_name,
-        )
+    # Simulate daily temperature variation
+    hour_of_day = air_timestamps.hour + air_timestamps.minute / 60
+    temp_variation = 3 * ((hour_of_day - 12) / 12)  # +/- 3 degrees through day
+    air_temps = base_temp_air + temp_variation + rng.normal(0, 0.5, air_points)
 
-        if i % 100 == 0:
-            store.flush(table_name)
-            print(f"  Generated {i}/{air_points} air sensor points...")
+    # Humidity varies inversely with temperature
+    humidity_variation = -2 * temp_variation
+    air_humidities = np.clip(
+        base_humidity + humidity_variation + rng.normal(0, 2, air_points), 20, 80
+    )
+
+    air = pd.DataFrame(
+        {
+            "timestamp": air_timestamps,
+            "topic": f"yolink/air/{air_device_id}",
+            "device_id": air_device_id,
+            "device_type": "air",
+            "temperature": air_temps,
+            "humidity": air_humidities,
+            "battery": rng.integers(95, 100, air_points, endpoint=True),
+            "signal": rng.integers(-55, -45, air_points, endpoint=True),
+        }
+    )
 
     # Generate data points every 10 minutes for water sensor
     water_points = days * 24 * 6  # 6 per hour
     water_device_id = "d88b4c010008bbe2"
     base_temp_water = 68.0
 
-    for i in range(water_points):
-        timestamp = now - timedelta(minutes=10 * (water_points - i))
-
-        # Water temperature is more stable
-        temperature = base_temp_water + gauss(0, 1.0)
-
-        battery = randint(90, 100)
-        signal = randint(-60, -50)
-
-        raw_data = {
-            "event": "THSensor.Report",
-            "deviceId": water_device_id,
-            "data": {
-                "temperature": temperature,
-                "humidity": 0,  # Water sensor doesn't measure humidity
-                "battery": battery,
-                "loraInfo": {"signal": signal},
-            },
-            "time": timestamp.isoformat(),
+    water = pd.DataFrame(
+        {
+            "timestamp": minute_timestamps(now, water_points, 10),
+            "topic": f"yolink/water/{water_device_id}",
+            "device_id": water_device_id,
+            "device_type": "water",
+            # Water temperature is more stable
+            "temperature": base_temp_water + rng.normal(0, 1.0, water_points),
+            "humidity": None,  # Water sensor doesn't measure humidity
+            "battery": rng.integers(90, 100, water_points, endpoint=True),
+            "signal": rng.integers(-60, -50, water_points, endpoint=True),
         }
+    )
 
-        store.insert_yolink_message(
-            device_type="water",
-            device_id=water_device_id,
-            temperature=temperature,
-            humidity=None,
-            battery=battery,
-            signal=signal,
-            raw_data=raw_data,
-            table_name=table_name,
-        )
-
-        if i % 100 == 0:
-            store.flush(table_name)
-            print(f"  Generated {i}/{water_points} water sensor points...")
-
-    # Final flush
-    store.flush(table_name)
+    frame = pd.concat([air, water], ignore_index=True)
+    # Let DuckDB serialize the raw YoLink report for every row at once
+    raw_json = """to_json({
+        'event': 'THSensor.Report',
+        'deviceId': device_id,
+        'data': {
+            'temperature': temperature,
+            'humidity': COALESCE(humidity, 0),
+            'battery': battery,
+            'loraInfo': {'signal': signal}
+        },
+        'time': strftime(timestamp, '%Y-%m-%dT%H:%M:%S.%f')
+    })"""
+    bulk_insert(store, table_name, frame, derived={"raw_json": raw_json})
     print(f"  ✓ Generated {air_points} air + {water_points} water sensor data points")
 
 
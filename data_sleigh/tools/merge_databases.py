@@ -16,8 +16,11 @@ Example:
 """
 
 import argparse
+import functools
 import logging
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import duckdb
@@ -29,18 +32,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def get_tables(conn: duckdb.DuckDBPyConnection) -> list[str]:
-    """Get list of tables in the database."""
-    result = conn.execute(
-        "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
-    ).fetchall()
-    return [row[0] for row in result]
+def attach_database(
+    conn: duckdb.DuckDBPyConnection, path: Path, alias: str
+) -> None:
+    """Attach another database file read-only under the given alias."""
+    quoted_path = str(path).replace("'", "''")
+    conn.execute(f"ATTACH '{quoted_path}' AS {alias} (READ_ONLY)")
+
 
+def get_schema(
+    conn: duckdb.DuckDBPyConnection, database: str | None = None
+) -> dict[str, list[str]]:
+    """Get every table in a database with its column names, in one query.
 
-def get_table_columns(conn: duckdb.DuckDBPyConnection, table_name: str) -> list[str]:
-    """Get column names for a table."""
-    result = conn.execute(f"PRAGMA table_info('{table_name}')").fetchall()
-    return [row[1] for row in result]
+    Args:
+        conn: DuckDB connection
+        database: Attached database alias to inspect (default: the main database)
+
+    Returns:
+        Mapping of table name to column names in table order
+    """
+    result = conn.execute(
+        """SELECT table_name, list(column_name ORDER BY column_index)
+           FROM duckdb_columns()
+           WHERE schema_name = 'main'
+           AND database_name = COALESCE(?, current_database())
+           GROUP BY table_name""",
+        [database],
+    ).fetchall()
+    return dict(result)
 
 
 def is_yolink_table(table_name: str, columns: list[str]) -> bool:
@@ -57,27 +77,45 @@ def is_yolink_table(table_name: str, columns: list[str]) -> bool:
     return "device_id" in columns and "device_type" in columns
 
 
+@functools.cache
+def build_select_list(
+    canonical_columns: tuple[str, ...], source_columns: frozenset[str]
+) -> str:
+    """Build the canonical select list for a source, NULL-padding missing columns."""
+    return ", ".join(
+        col if col in source_columns else f"NULL as {col}"
+        for col in canonical_columns
+    )
+
+
 def merge_tables(
-    old_conn: duckdb.DuckDBPyConnection,
-    new_conn: duckdb.DuckDBPyConnection,
     out_conn: duckdb.DuckDBPyConnection,
     table_name: str,
+    old_schema: dict[str, list[str]],
+    new_schema: dict[str, list[str]],
 ) -> tuple[int, int, int]:
     """Merge a table from old and new databases into output.
 
+    The old and new databases must be attached to out_conn as olddb and newdb.
+
+    Args:
+        out_conn: Output connection with both inputs attached
+        table_name: Table to merge
+        old_schema: Column names of every table in the old database
+        new_schema: Column names of every table in the new database
+
     Returns:
         Tuple of (old_count, new_count, merged_count)
     """
-    old_tables = get_tables(old_conn)
-    new_tables = get_tables(new_conn)
-
-    if table_name not in old_tables and table_name not in new_tables:
+    if table_name not in old_schema and table_name not in new_schema:
         logger.warning(f"Table {table_name} not found in either database")
         return 0, 0, 0
 
-    # Get columns from each database separately
-    old_columns = get_table_columns(old_conn, table_name) if table_name in old_tables else []
-    new_columns = get_table_columns(new_conn, table_name) if table_name in new_tables else []
+    old_columns = old_schema.get(table_name, [])
+    new_columns = new_schema.get(table_name, [])
+
+    # Create, load and index the table in one transaction (one commit/WAL flush)
+    out_conn.begin()
 
     # Determine table type based on table name and columns
     all_columns = old_columns or new_columns
@@ -120,21 +158,23 @@ def merge_tables(
             )
         """)
 
-    out_conn.commit()
     canonical_str = ", ".join(canonical_columns)
-    placeholders = ", ".join(["?" for _ in canonical_columns])
 
     old_count = 0
     new_count = 0
 
-    def copy_from_db(
-        source_conn: duckdb.DuckDBPyConnection,
-        source_columns: list[str],
-        deduplicate: bool = False,
-    ) -> tuple[int, int, int]:
-        """Copy records from source to output, optionally deduplicating."""
+    # Key used to detect new records that are already in the old database
+    if is_yolink:
+        dedup_columns = ["timestamp", "device_id", "device_type"]
+    else:
+        dedup_columns = ["timestamp", "topic"]
+    dedup_match = " AND ".join(f"o.{col} = s.{col}" for col in dedup_columns)
+    dedup_partition = ", ".join(f"s.{col}" for col in dedup_columns)
+
+    def source_select(source_columns: list[str]) -> str | None:
+        """Build the canonical select list for a source, or None if unusable."""
         # Check if source has required columns for this table type
-        source_cols_set = set(source_columns)
+        source_cols_set = frozenset(source_columns)
 
         if is_yolink:
             # YoLink tables need device_id and device_type to be useful
@@ -144,86 +184,83 @@ def merge_tables(
                     f"  Skipping source - incompatible schema "
                     f"(missing: {required_cols - source_cols_set})"
                 )
-                return 0, 0, 0
-
-        # Build column mapping - use source column if it exists, else NULL
-        select_parts = []
-        for col in canonical_columns:
-            if col in source_cols_set:
-                select_parts.append(col)
-            else:
-                select_parts.append(f"NULL as {col}")
-        select_str = ", ".join(select_parts)
+                return None
 
-        data = source_conn.execute(f"SELECT {select_str} FROM {table_name}").fetchall()
-        total = len(data)
+        return build_select_list(tuple(canonical_columns), source_cols_set)
 
-        if not deduplicate:
-            out_conn.executemany(
-                f"INSERT INTO {table_name} ({canonical_str}) VALUES ({placeholders})",
-                data
-            )
-            out_conn.commit()
-            return total, 0, total
-
-        # Deduplicate against existing records
-        inserted = 0
-        skipped = 0
-
-        for row in data:
-            row_dict = dict(zip(canonical_columns, row))
-
-            if is_yolink:
-                check_result = out_conn.execute(
-                    f"""SELECT 1 FROM {table_name}
-                        WHERE timestamp = ? AND device_id = ? AND device_type = ?
-                        LIMIT 1""",
-                    [row_dict["timestamp"], row_dict["device_id"], row_dict["device_type"]]
-                ).fetchone()
-            else:
-                check_result = out_conn.execute(
-                    f"""SELECT 1 FROM {table_name}
-                        WHERE timestamp = ? AND topic = ?
-                        LIMIT 1""",
-                    [row_dict["timestamp"], row_dict["topic"]]
-                ).fetchone()
-
-            if check_result is None:
-                out_conn.execute(
-                    f"INSERT INTO {table_name} ({canonical_str}) VALUES ({placeholders})",
-                    row
-                )
-                inserted += 1
-            else:
-                skipped += 1
-
-        out_conn.commit()
-        return total, inserted, skipped
-
-    # Insert from old database (no deduplication needed - it's first)
-    if table_name in old_tables and old_columns:
-        result = old_conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
+    old_select = None
+    if old_columns:
+        result = out_conn.execute(
+            f"SELECT COUNT(*) FROM olddb.main.{table_name}"
+        ).fetchone()
         old_count = result[0] if result else 0
 
         if old_count > 0:
             logger.info(f"  Copying {old_count} records from old database...")
-            copy_from_db(old_conn, old_columns, deduplicate=False)
+            old_select = source_select(old_columns)
 
-    # Insert from new database with deduplication
-    if table_name in new_tables and new_columns:
-        result = new_conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
+    new_select = None
+    if new_columns:
+        result = out_conn.execute(
+            f"SELECT COUNT(*) FROM newdb.main.{table_name}"
+        ).fetchone()
         new_count = result[0] if result else 0
 
         if new_count > 0:
             logger.info(f"  Merging {new_count} records from new database (deduplicating)...")
-            _, inserted, skipped = copy_from_db(new_conn, new_columns, deduplicate=True)
-            logger.info(f"  Inserted {inserted} new records, skipped {skipped} duplicates")
+            new_select = source_select(new_columns)
+
+    # Merge both sides in one statement: every old record (it's first), then
+    # new records whose key is not among the old ones. The QUALIFY keeps only
+    # the first new row per key, so duplicates within the new database are
+    # dropped as well.
+    ctes = []
+    branches = []
+    if old_select is not None and new_select is None:
+        # Nothing to deduplicate against: stream the old table straight in
+        branches.append(f"SELECT {old_select} FROM olddb.main.{table_name}")
+    elif old_select is not None:
+        ctes.append(f"old_rows AS (SELECT {old_select} FROM olddb.main.{table_name})")
+        branches.append(f"SELECT {canonical_str} FROM old_rows")
+    if new_select is not None:
+        not_in_old = (
+            f"WHERE NOT EXISTS (SELECT 1 FROM old_rows o WHERE {dedup_match})"
+            if old_select is not None
+            else ""
+        )
+        # The window reorders rows, so sort back into source order to keep
+        # the assigned ids deterministic
+        branches.append(f"""
+            (SELECT {canonical_str} FROM (
+                SELECT {new_select}, rowid AS _source_row
+                FROM newdb.main.{table_name}
+            ) AS s
+            {not_in_old}
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY {dedup_partition} ORDER BY s._source_row
+            ) = 1
+            ORDER BY s._source_row)
+        """)
 
-    # Get final count
-    result = out_conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
-    merged_count = result[0] if result else 0
+    if branches:
+        with_clause = f"WITH {', '.join(ctes)}" if ctes else ""
+        result = out_conn.execute(f"""
+            INSERT INTO {table_name} ({canonical_str})
+            {with_clause}
+            {" UNION ALL ".join(branches)}
+        """).fetchone()
+        inserted = result[0] if result else 0
+
+        if new_select is not None:
+            copied_old = old_count if old_select is not None else 0
+            new_inserted = inserted - copied_old
+            logger.info(
+                f"  Inserted {new_inserted} new records, "
+                f"skipped {new_count - new_inserted} duplicates"
+            )
 
-    # Create indexes
+    # Build the indexes in one pass over the loaded table rather
+    # than maintaining them row by row during the insert
     out_conn.execute(f"""
         CREATE INDEX IF NOT EXISTS idx_{table_name}_timestamp
         ON {table_name}(timestamp)
@@ -237,16 +274,26 @@ def merge_tables(
 
     out_conn.commit()
 
+    # Get final count
+    result = out_conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()
+    merged_count = result[0] if result else 0
+
     return old_count, new_count, merged_count
 
 
-def merge_databases(old_path: Path, new_path: Path, output_path: Path) -> None:
+def merge_databases(
+    old_path: Path,
+    new_path: Path,
+    output_path: Path,
+    memory_limit: str = "8GB",
+) -> None:
     """Merge two DuckDB databases into a single output database.
 
     Args:
         old_path: Path to the old/historical database
         new_path: Path to the new database
         output_path: Path for the merged output database
+        memory_limit: DuckDB memory limit for the merge (e.g. "8GB")
     """
     logger.info(f"Old database: {old_path}")
     logger.info(f"New database: {new_path}")
@@ -266,15 +313,26 @@ def merge_databases(old_path: Path, new_path: Path, output_path: Path) -> None:
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Open connections
-    old_conn = duckdb.connect(str(old_path), read_only=True)
-    new_conn = duckdb.connect(str(new_path), read_only=True)
+    # Open the output and attach both inputs so merges run as plain SQL
     out_conn = duckdb.connect(str(output_path))
 
     try:
+        # One engine-wide thread pool, sized to the machine; insertion order
+        # is left on so old records keep the lower ids
+        out_conn.execute(f"PRAGMA threads={os.cpu_count() or 1}")
+        out_conn.execute(f"PRAGMA memory_limit='{memory_limit}'")
+        # Hold the per-table commits in the WAL; one checkpoint at the end
+        # writes everything out
+        out_conn.execute("PRAGMA wal_autocheckpoint='1GB'")
+
+        attach_database(out_conn, old_path, "olddb")
+        attach_database(out_conn, new_path, "newdb")
+
         # Get all tables from both databases
-        old_tables = set(get_tables(old_conn))
-        new_tables = set(get_tables(new_conn))
+        old_schema = get_schema(out_conn, "olddb")
+        new_schema = get_schema(out_conn, "newdb")
+        old_tables = set(old_schema)
+        new_tables = set(new_schema)
         all_tables = old_tables | new_tables
 
         # Filter out internal/system tables
@@ -284,18 +342,30 @@ def merge_databases(old_path: Path, new_path: Path, output_path: Path) -> None:
         logger.info(f"Tables in new database: {sorted(new_tables)}")
         logger.info(f"Tables to merge: {sorted(all_tables)}")
 
-        # Merge each table
-        for table_name in sorted(all_tables):
-            logger.info(f"\nMerging table: {table_name}")
-            old_count, new_count, merged_count = merge_tables(
-                old_conn, new_conn, out_conn, table_name
-            )
+        # Merge tables concurrently; each worker gets its own cursor, and
+        # DuckDB releases the GIL while the INSERT ... SELECT runs
+        def merge_one(table_name: str) -> tuple[int, int, int]:
+            cursor = out_conn.cursor()
+            try:
+                return merge_tables(cursor, table_name, old_schema, new_schema)
+            finally:
+                cursor.close()
+
+        table_order = sorted(all_tables)
+        max_workers = max(1, min(len(table_order), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(merge_one, table_order))
+
+        for table_name, (old_count, new_count, merged_count) in zip(
+            table_order, results, strict=True
+        ):
+            logger.info(f"\nMerged table: {table_name}")
             logger.info(
                 f"  Result: {old_count} (old) + {new_count} (new) -> {merged_count} (merged)"
             )
 
         # Final checkpoint
-        out_conn.execute("CHECKPOINT")
+        out_conn.execute("FORCE CHECKPOINT")
         logger.info("\n✅ Merge complete!")
 
         # Print final stats
@@ -316,8 +386,6 @@ def merge_databases(old_path: Path, new_path: Path, output_path: Path) -> None:
                 logger.info(f"  {table_name}: {count} records")
 
     finally:
-        old_conn.close()
-        new_conn.close()
         out_conn.close()
 
 
@@ -356,6 +424,11 @@ Examples:
         type=Path,
         help="Path for the merged output database",
     )
+    parser.add_argument(
+        "--memory-limit",
+        default="8GB",
+        help="DuckDB memory limit for the merge (default: 8GB)",
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -368,7 +441,9 @@ Examples:
         logging.getLogger().setLevel(logging.DEBUG)
 
     try:
-        merge_databases(args.old_db, args.new_db, args.output_db)
+        merge_databases(
+            args.old_db, args.new_db, args.output_db, memory_limit=args.memory_limit
+        )
     except Exception as e:
         logger.error(f"Merge failed: {e}")
         sys.exit(1)